@@ -7,6 +7,333 @@
 #              without leaving their general in check. The XiangqiGame class has a Board class. The Board class has
 #              BoardPoints class. The BoardPoints class has GamePiece class.
 
+import random
+from collections import OrderedDict
+
+# piece codes stored on the array-backed board. The low three bits are the piece type and the next two bits are the
+# color, so the type or color of a code can be found with a single mask.
+EMPTY = 0
+GENERAL = 1
+ADVISOR = 2
+ELEPHANT = 3
+HORSE = 4
+CHARIOT = 5
+CANNON = 6
+SOLDIER = 7
+TYPE_MASK = 7
+RED = 8
+BLACK = 16
+COLOR_MASK = RED | BLACK
+# stored on the padded border around the board. Has no color bits so it is never a friend or an enemy.
+OFF_BOARD = 32
+
+# the board is stored as a 16x16 array with the 10x9 playing area starting at row 3 and column 3. The border is wide
+# enough that every step or jump off the playing area lands on an OFF_BOARD square instead of going out of range.
+BOARD_WIDTH = 16
+BOARD_SIZE = 256
+FIRST_ROW = 3
+FIRST_COLUMN = 3
+
+# steps on the array-backed board.
+UP = -BOARD_WIDTH
+DOWN = BOARD_WIDTH
+LEFT = -1
+RIGHT = 1
+ORTHOGONAL_STEPS = (UP, DOWN, LEFT, RIGHT)
+
+COLOR_CODES = {"red": RED, "black": BLACK}
+COLOR_NAMES = {RED: "red", BLACK: "black"}
+PIECE_TYPE_CODES = {"general": GENERAL, "advisor": ADVISOR, "elephant": ELEPHANT, "horse": HORSE,
+                    "chariot": CHARIOT, "cannon": CANNON, "soldier": SOLDIER}
+PIECE_TYPE_NAMES = {code: name for name, code in PIECE_TYPE_CODES.items()}
+
+# the letters for each piece type in FEN. Red pieces are upper case and black pieces are lower case. The elephant and
+# horse are also read as "e" and "h", which some programs write instead of "b" and "n".
+FEN_PIECE_LETTERS = {GENERAL: "k", ADVISOR: "a", ELEPHANT: "b", HORSE: "n", CHARIOT: "r", CANNON: "c", SOLDIER: "p"}
+FEN_PIECE_TYPES = {letter: code for code, letter in FEN_PIECE_LETTERS.items()}
+FEN_PIECE_TYPES.update({"e": ELEPHANT, "h": HORSE})
+START_FEN = "rnbakabnr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNBAKABNR w - - 0 1"
+
+# the number of times a position must come up for the game to be adjudicated as a repetition.
+REPETITION_LIMIT = 3
+
+
+def square_index(row, column):
+    """Takes a row and column as integers and returns the index of that point on the array-backed board."""
+    return (row + FIRST_ROW) * BOARD_WIDTH + column + FIRST_COLUMN
+
+
+def square_row(square):
+    """Takes an index on the array-backed board and returns the row of that point."""
+    return (square >> 4) - FIRST_ROW
+
+
+def square_column(square):
+    """Takes an index on the array-backed board and returns the column of that point."""
+    return (square & 15) - FIRST_COLUMN
+
+
+# every index on the array-backed board that is part of the playing area, ordered by row and then column.
+BOARD_SQUARES = tuple(square_index(row, column) for row in range(0, 10) for column in range(0, 9))
+
+# maps algebraic notation such as "a1" or "e10" to the index of that point on the array-backed board. The columns are
+# "a" to "i" and the rows are "1" to "10", with row "1" on red's side.
+ALGEBRAIC_SQUARES = {"abcdefghi"[square_column(square)] + str(square_row(square) + 1): square
+                     for square in BOARD_SQUARES}
+
+# a position packed into bytes holds each point as a 4-bit nibble, two points to a byte in the order of BOARD_SQUARES,
+# followed by one byte for whose turn it is. A nibble is the piece type with 8 added for black pieces, or 0 for an
+# empty point.
+PACKED_BOARD_BYTES = len(BOARD_SQUARES) // 2
+PACKED_POSITION_BYTES = PACKED_BOARD_BYTES + 1
+PACKED_SQUARE_PAIRS = tuple(zip(BOARD_SQUARES[0::2], BOARD_SQUARES[1::2]))
+# maps a piece code to its nibble, and a nibble to its piece code. Nibble 8 is not used and maps to None.
+PACKED_NIBBLES = {EMPTY: 0}
+PACKED_NIBBLES.update({RED | piece_type: piece_type for piece_type in range(GENERAL, SOLDIER + 1)})
+PACKED_NIBBLES.update({BLACK | piece_type: 8 | piece_type for piece_type in range(GENERAL, SOLDIER + 1)})
+
+
+def _build_packed_codes():
+    """Returns the reverse of PACKED_NIBBLES: a list indexed by nibble of the piece code it stands for, with None for a
+    nibble that is not used."""
+    codes = [None] * 16
+    for code, nibble in PACKED_NIBBLES.items():
+        codes[nibble] = code
+    return codes
+
+
+PACKED_CODES = _build_packed_codes()
+
+
+def encode_move(from_square, to_square):
+    """Takes the index a piece moves from and the index it moves to and returns the move as a single integer."""
+    return from_square << 8 | to_square
+
+
+def move_from_square(move):
+    """Takes a move encoded by encode_move and returns the index the piece moves from."""
+    return move >> 8
+
+
+def move_to_square(move):
+    """Takes a move encoded by encode_move and returns the index the piece moves to."""
+    return move & 255
+
+
+def square_name(square):
+    """Takes an index on the array-backed board and returns its algebraic notation, such as "e1"."""
+    return "abcdefghi"[square_column(square)] + str(square_row(square) + 1)
+
+
+def _build_move_table(steps, rows, columns, blocking_step=None):
+    """Takes a tuple of (row step, column step) pairs, the rows and columns a piece is allowed to move to, and
+    optionally a function that takes a step and returns the (row step, column step) of the point that blocks it.
+    Returns a list indexed by square of the destinations of a piece on that square. When a blocking step function is
+    given each destination is a (destination, blocking square) pair, otherwise it is just the destination."""
+    table = [()] * BOARD_SIZE
+    for square in BOARD_SQUARES:
+        row = square_row(square)
+        column = square_column(square)
+        destinations = []
+        for row_step, column_step in steps:
+            if row + row_step not in rows or column + column_step not in columns:
+                continue
+            to_square = square_index(row + row_step, column + column_step)
+            if blocking_step is None:
+                destinations.append(to_square)
+            else:
+                block_row_step, block_column_step = blocking_step(row_step, column_step)
+                destinations.append((to_square, square_index(row + block_row_step, column + block_column_step)))
+        table[square] = tuple(destinations)
+    return table
+
+
+# the rows of each color's palace and half of the board. The palace is columns 3 to 5 for both colors.
+PALACE_ROWS = {RED: range(0, 3), BLACK: range(7, 10)}
+PALACE_COLUMNS = range(3, 6)
+HOME_ROWS = {RED: range(0, 5), BLACK: range(5, 10)}
+
+GENERAL_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIAGONAL_STEPS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ELEPHANT_STEPS = ((-2, -2), (-2, 2), (2, -2), (2, 2))
+HORSE_STEPS = ((-2, -1), (-2, 1), (2, -1), (2, 1), (-1, -2), (1, -2), (-1, 2), (1, 2))
+
+
+def _elephant_eye(row_step, column_step):
+    """Takes an elephant's step and returns the step to the point in the middle of it, the elephant's eye."""
+    return row_step // 2, column_step // 2
+
+
+def _horse_leg(row_step, column_step):
+    """Takes a horse's step and returns the step to the point next to the horse in the direction it moves two
+    points, the horse's leg."""
+    if abs(row_step) == 2:
+        return row_step // 2, 0
+    return 0, column_step // 2
+
+
+def _build_soldier_table(color, forward_row_step):
+    """Takes a color and the row step that moves that color's soldiers forward and returns the soldier move table.
+    A soldier moves forward, and also sideways once it has crossed the river into the other color's half."""
+    forward_moves = _build_move_table(((forward_row_step, 0),), range(0, 10), range(0, 9))
+    sideways_moves = _build_move_table(((0, -1), (0, 1)), range(0, 10), range(0, 9))
+    table = list(forward_moves)
+    for square in BOARD_SQUARES:
+        if square_row(square) not in HOME_ROWS[color]:
+            table[square] += sideways_moves[square]
+    return table
+
+
+# precomputed destinations for each color and square, built once at import. The elephant and horse tables hold
+# (destination, blocking square) pairs: the elephant's eye and the horse's leg.
+GENERAL_MOVES = {color: _build_move_table(GENERAL_STEPS, PALACE_ROWS[color], PALACE_COLUMNS) for color in (RED, BLACK)}
+ADVISOR_MOVES = {color: _build_move_table(DIAGONAL_STEPS, PALACE_ROWS[color], PALACE_COLUMNS)
+                 for color in (RED, BLACK)}
+ELEPHANT_MOVES = {color: _build_move_table(ELEPHANT_STEPS, HOME_ROWS[color], range(0, 9), _elephant_eye)
+                  for color in (RED, BLACK)}
+HORSE_MOVES = _build_move_table(HORSE_STEPS, range(0, 10), range(0, 9), _horse_leg)
+SOLDIER_MOVES = {RED: _build_soldier_table(RED, 1), BLACK: _build_soldier_table(BLACK, -1)}
+
+
+def _build_ray_table():
+    """Returns a list indexed by square of the lines a chariot or cannon on that square moves along: a tuple of the
+    points up, down, left and right of it in ORTHOGONAL_STEPS order, each a tuple of squares from the nearest point to
+    the edge of the board. Lines with no points are left out."""
+    table = [()] * BOARD_SIZE
+    for square in BOARD_SQUARES:
+        rays = []
+        for step in ORTHOGONAL_STEPS:
+            ray = []
+            to_square = square + step
+            while 0 <= square_row(to_square) < 10 and 0 <= square_column(to_square) < 9:
+                ray.append(to_square)
+                to_square += step
+            if ray:
+                rays.append(tuple(ray))
+        table[square] = tuple(rays)
+    return table
+
+
+# precomputed lines of points from each square to the edges of the board, walked by the chariot and cannon.
+ORTHOGONAL_RAYS = _build_ray_table()
+
+
+def _build_attack_table(move_table):
+    """Takes a move table and returns the reverse of it: a list indexed by square of the squares a piece could attack
+    that square from. Entries of a move table with blocking squares keep the same blocking square."""
+    table = [[] for square in range(0, BOARD_SIZE)]
+    for square in BOARD_SQUARES:
+        for destination in move_table[square]:
+            if isinstance(destination, tuple):
+                table[destination[0]].append((square, destination[1]))
+            else:
+                table[destination].append(square)
+    return [tuple(attackers) for attackers in table]
+
+
+# precomputed squares each kind of piece could attack a square from, used to test if a square is attacked without
+# generating the other color's moves.
+GENERAL_ATTACKS = {color: _build_attack_table(GENERAL_MOVES[color]) for color in (RED, BLACK)}
+ADVISOR_ATTACKS = {color: _build_attack_table(ADVISOR_MOVES[color]) for color in (RED, BLACK)}
+ELEPHANT_ATTACKS = {color: _build_attack_table(ELEPHANT_MOVES[color]) for color in (RED, BLACK)}
+HORSE_ATTACKS = _build_attack_table(HORSE_MOVES)
+SOLDIER_ATTACKS = {color: _build_attack_table(SOLDIER_MOVES[color]) for color in (RED, BLACK)}
+
+
+def _build_zobrist_keys():
+    """Returns a tuple of the Zobrist keys as a list indexed by piece code of lists indexed by square, and the key for
+    black to move, drawn in that order from a random generator with a fixed seed."""
+    zobrist_random = random.Random(20200309)
+    keys = [None] * ((BLACK | TYPE_MASK) + 1)
+    for color in (RED, BLACK):
+        for piece_type in PIECE_TYPE_NAMES:
+            keys[color | piece_type] = [zobrist_random.getrandbits(64) for _square in range(0, BOARD_SIZE)]
+    return keys, zobrist_random.getrandbits(64)
+
+
+# random 64-bit Zobrist keys for each piece code on each square, and for black to move. A position's hash is the
+# exclusive or of the keys of its pieces, so it can be updated with a few exclusive ors as pieces move. The seed is
+# fixed so the same position has the same hash in every process.
+ZOBRIST_KEYS, ZOBRIST_BLACK_TO_MOVE = _build_zobrist_keys()
+
+# the value of each piece type. The general is not counted because losing it ends the game.
+PIECE_VALUES = {GENERAL: 0, ADVISOR: 200, ELEPHANT: 200, HORSE: 400, CHARIOT: 900, CANNON: 450, SOLDIER: 100}
+
+# bonuses added to a piece's value for the point it stands on, from red's side of the board: row 0 is red's back row.
+# Black's tables are the same turned upside down. Soldiers are worth more once they cross the river and more again
+# as they close in on the palace, horses are worth more in the center than on the edge, and so on.
+PIECE_SQUARE_BONUSES = {
+    GENERAL: ((0, 0, 0, -2, 0, -2, 0, 0, 0),
+              (0, 0, 0, -10, -8, -10, 0, 0, 0),
+              (0, 0, 0, -20, -16, -20, 0, 0, 0)) + ((0,) * 9,) * 7,
+    ADVISOR: ((0, 0, 0, 0, 0, 0, 0, 0, 0),
+              (0, 0, 0, 0, 4, 0, 0, 0, 0),
+              (0, 0, 0, 0, 0, 0, 0, 0, 0)) + ((0,) * 9,) * 7,
+    ELEPHANT: ((0, 0, 0, 0, 0, 0, 0, 0, 0),
+               (0, 0, 0, 0, 0, 0, 0, 0, 0),
+               (-2, 0, 0, 0, 4, 0, 0, 0, -2)) + ((0,) * 9,) * 7,
+    HORSE: ((0, -4, 0, 0, 0, 0, 0, -4, 0),
+            (0, 2, 4, 4, -2, 4, 4, 2, 0),
+            (4, 2, 8, 8, 4, 8, 8, 2, 4),
+            (2, 6, 8, 6, 10, 6, 8, 6, 2),
+            (4, 12, 16, 14, 12, 14, 16, 12, 4),
+            (6, 16, 14, 18, 16, 18, 14, 16, 6),
+            (8, 24, 18, 24, 20, 24, 18, 24, 8),
+            (12, 14, 16, 20, 18, 20, 16, 14, 12),
+            (4, 10, 28, 16, 8, 16, 28, 10, 4),
+            (4, 8, 16, 12, 4, 12, 16, 8, 4)),
+    CHARIOT: ((-2, 10, 6, 14, 12, 14, 6, 10, -2),
+              (8, 4, 8, 16, 8, 16, 8, 4, 8),
+              (4, 8, 6, 14, 12, 14, 6, 8, 4),
+              (6, 10, 8, 14, 14, 14, 8, 10, 6),
+              (12, 16, 14, 20, 20, 20, 14, 16, 12),
+              (12, 14, 12, 18, 18, 18, 12, 14, 12),
+              (12, 18, 16, 22, 22, 22, 16, 18, 12),
+              (12, 12, 12, 18, 18, 18, 12, 12, 12),
+              (16, 20, 18, 24, 26, 24, 18, 20, 16),
+              (14, 14, 12, 18, 16, 18, 12, 14, 14)),
+    CANNON: ((0, 0, 2, 6, 6, 6, 2, 0, 0),
+             (0, 2, 4, 6, 6, 6, 4, 2, 0),
+             (4, 0, 8, 6, 10, 6, 8, 0, 4),
+             (0, 0, 0, 2, 4, 2, 0, 0, 0),
+             (-2, 0, 4, 2, 6, 2, 4, 0, -2),
+             (0, 0, 0, 2, 8, 2, 0, 0, 0),
+             (0, 0, -2, 4, 10, 4, -2, 0, 0),
+             (2, 2, 0, -10, -8, -10, 0, 2, 2),
+             (2, 2, 0, -4, -14, -4, 0, 2, 2),
+             (6, 4, 0, -10, -12, -10, 0, 4, 6)),
+    SOLDIER: ((0, 0, 0, 0, 0, 0, 0, 0, 0),
+              (0, 0, 0, 0, 0, 0, 0, 0, 0),
+              (0, 0, 0, 0, 0, 0, 0, 0, 0),
+              (0, 0, -2, 0, 4, 0, -2, 0, 0),
+              (2, 0, 8, 0, 8, 0, 8, 0, 2),
+              (6, 12, 18, 18, 20, 18, 18, 12, 6),
+              (10, 20, 30, 34, 40, 34, 30, 20, 10),
+              (14, 26, 42, 60, 80, 60, 42, 26, 14),
+              (18, 36, 56, 80, 120, 80, 56, 36, 18),
+              (0, 3, 6, 9, 12, 9, 6, 3, 0)),
+}
+
+
+def _build_piece_square_values():
+    """Returns a list indexed by piece code of lists indexed by square of the piece's value plus its bonus for that
+    point from PIECE_SQUARE_BONUSES. Black's values are negative and use the bonus tables turned upside down."""
+    values = [None] * ((BLACK | TYPE_MASK) + 1)
+    for piece_type, bonuses in PIECE_SQUARE_BONUSES.items():
+        values[RED | piece_type] = [0] * BOARD_SIZE
+        values[BLACK | piece_type] = [0] * BOARD_SIZE
+        for square in BOARD_SQUARES:
+            row = square_row(square)
+            column = square_column(square)
+            values[RED | piece_type][square] = PIECE_VALUES[piece_type] + bonuses[row][column]
+            values[BLACK | piece_type][square] = -PIECE_VALUES[piece_type] - bonuses[9 - row][column]
+    return values
+
+
+# the value of each piece code on each square, counting for red and against black, so the evaluation of a position is
+# the sum over its pieces and can be updated as pieces move, the same as the hash.
+PIECE_SQUARE_VALUES = _build_piece_square_values()
+
 
 class GamePiece:
     """Represents a Xiangqi game piece"""
@@ -38,6 +365,16 @@ class GamePiece:
         """Takes a row and column as integers and changes the location of the piece."""
         self._location = (row, column)
 
+    def get_square(self):
+        """Returns the index of the piece's location on the array-backed board."""
+        return square_index(self._location[0], self._location[1])
+
+    def get_piece_code(self):
+        """Returns the code that represents the piece on the array-backed board."""
+        if self._color is None:
+            return EMPTY
+        return COLOR_CODES[self._color.lower()] | PIECE_TYPE_CODES[self._piece_type.lower()]
+
 
 class General(GamePiece):
     """Represents a general game piece with inheritance from GamePiece."""
@@ -54,42 +391,9 @@ class General(GamePiece):
     def possible_moves(self):
         """Uses the piece's location and returns a list of possible moves. Note: does not mean the move is valid, does
         not take in account if the location is already occupied."""
-        list_of_possible_moves = []
-        current_row = self._location[0]
-        current_column = self._location[1]
-
-        # boundary limits of a red general.
-        if self.get_game_piece_color() == "red":
-            min_row = 0
-            max_row = 2
-            min_column = 3
-            max_column = 5
-
-        # boundary limits of a black general.
-        else:
-            min_row = 7
-            max_row = 9
-            min_column = 3
-            max_column = 5
-
-        for next_row_index in range(-1, 2):  # the piece can potentially move one row ahead or behind.
-            for next_column_index in range(-1, 2):  # the piece can potentially move one column ahead or behind
-                possible_row_move = current_row + next_row_index
-                possible_column_move = current_column + next_column_index
-
-                # if the row is out of bounds.
-                if possible_row_move < min_row or possible_row_move > max_row:
-                    continue
-                # if the column is out of bounds.
-                elif possible_column_move < min_column or possible_column_move > max_column:
-                    continue
-                # the piece would already be in the location. No need to append to list.
-                elif possible_row_move == current_row and possible_column_move == current_column:
-                    continue
-
-                list_of_possible_moves.append((possible_row_move, possible_column_move))
-
-        return list_of_possible_moves
+        # look up the destinations in the precomputed general move table.
+        return [(square_row(to_square), square_column(to_square))
+                for to_square in GENERAL_MOVES[COLOR_CODES[self._color]][self.get_square()]]
 
 
 class Advisor(GamePiece):
@@ -107,46 +411,9 @@ class Advisor(GamePiece):
     def possible_moves(self):
         """Uses the piece's location and returns a list of possible moves. Note: does not mean the move is valid, does
         not take in account if the location is already occupied."""
-        list_of_possible_moves = []
-        current_row = self._location[0]
-        current_column = self._location[1]
-        slope = [-1, 1]  # the advisor can move diagonally, so the slope is either -1 or 1.
-
-        # boundary limits of a red advisor.
-        if self.get_game_piece_color() == "red":
-            min_row = 0
-            max_row = 2
-            min_column = 3
-            max_column = 5
-
-        # boundary limits of a black advisor.
-        else:
-            min_row = 7
-            max_row = 9
-            min_column = 3
-            max_column = 5
-
-        for next_row_index in range(-1, 2):  # the piece can potentially move one row ahead or behind.
-            for next_column_index in range(-1, 2):  # the piece can potentially move one column ahead or behind
-                possible_row_move = current_row + next_row_index
-                possible_column_move = current_column + next_column_index
-
-                # if the row is out of bounds.
-                if possible_row_move < min_row or possible_row_move > max_row:
-                    continue
-                # if the column is out of bounds.
-                elif possible_column_move < min_column or possible_column_move > max_column:
-                    continue
-                # to not get an error in division when calculating the slope.
-                elif possible_column_move - current_column == 0:
-                    continue
-                # calculate the slopes of the possible row and column moves.
-                elif (possible_row_move - current_row)/(possible_column_move - current_column) not in slope:
-                    continue
-
-                list_of_possible_moves.append((possible_row_move, possible_column_move))
-
-        return list_of_possible_moves
+        # look up the destinations in the precomputed advisor move table.
+        return [(square_row(to_square), square_column(to_square))
+                for to_square in ADVISOR_MOVES[COLOR_CODES[self._color]][self.get_square()]]
 
 
 class Elephant(GamePiece):
@@ -164,45 +431,9 @@ class Elephant(GamePiece):
     def possible_moves(self):
         """Uses the piece's location and returns a list of possible moves. Note: does not mean the move is valid, does
         not take in account if the location is already occupied."""
-        list_of_possible_moves = []
-        current_row = self._location[0]
-        current_column = self._location[1]
-        slope = [-1, 1]  # the elephant can move diagonally, so the slope is either -1 or 1.
-
-        # boundary limits of a red elephant. cannot move across river.
-        if self.get_game_piece_color() == "red":
-            min_row = 0
-            max_row = 4
-            min_column = 0
-            max_column = 8
-
-        # boundary limits of a black elephant.
-        else:
-            min_row = 5
-            max_row = 9
-            min_column = 0
-            max_column = 8
-
-        for next_row_index in range(-2, 3, 2):  # the piece can potentially move two row ahead or behind.
-            for next_column_index in range(-2, 3, 2):  # the piece can potentially move two column ahead or behind
-                possible_row_move = current_row + next_row_index
-                possible_column_move = current_column + next_column_index
-
-                if possible_row_move < min_row or possible_row_move > max_row:
-                    continue
-                elif possible_column_move < min_column or possible_column_move > max_column:
-                    continue
-
-                # to not get an error in division when calculating the slope.
-                if possible_column_move - current_column == 0:
-                    continue
-                # calculate the slopes of the possible row and column moves.
-                if (possible_row_move - current_row)/(possible_column_move - current_column) not in slope:
-                    continue
-
-                list_of_possible_moves.append((possible_row_move, possible_column_move))
-
-        return list_of_possible_moves
+        # look up the destinations in the precomputed elephant move table. Does not check the elephant's eye.
+        return [(square_row(to_square), square_column(to_square))
+                for to_square, eye_square in ELEPHANT_MOVES[COLOR_CODES[self._color]][self.get_square()]]
 
 
 class Horse(GamePiece):
@@ -220,38 +451,9 @@ class Horse(GamePiece):
     def possible_moves(self):
         """Uses the piece's location and returns a list of possible moves. Note: does not mean the move is valid, does
         not take in account if the location is already occupied."""
-        list_of_possible_moves = []
-        current_row = self._location[0]
-        current_column = self._location[1]
-        # the horse can move one point orthogonally and one point diagonally, the slope is either 0.5, -0.5, 2, or -2.
-        slope = [0.5, -0.5, 2, -2]
-        min_row = 0
-        max_row = 9
-        min_column = 0
-        max_column = 8
-
-        for next_row_index in range(-2, 3):  # the piece can potentially move up to two row ahead or behind.
-            for next_column_index in range(-2, 3):  # the piece can potentially move up to two column ahead or behind
-                possible_row_move = current_row + next_row_index
-                possible_column_move = current_column + next_column_index
-
-                # if the row is out of bounds
-                if possible_row_move < min_row or possible_row_move > max_row:
-                    continue
-                # if the column is out of bounds
-                elif possible_column_move < min_column or possible_column_move > max_column:
-                    continue
-
-                # to not get an error in division when calculating the slope.
-                if possible_column_move - current_column == 0:
-                    continue
-                # calculate the slopes of the possible row and column moves.
-                if (possible_row_move - current_row) / (possible_column_move - current_column) not in slope:
-                    continue
-
-                list_of_possible_moves.append((possible_row_move, possible_column_move))
-
-        return list_of_possible_moves
+        # look up the destinations in the precomputed horse move table. Does not check the horse's leg.
+        return [(square_row(to_square), square_column(to_square))
+                for to_square, leg_square in HORSE_MOVES[self.get_square()]]
 
 
 class Chariot(GamePiece):
@@ -310,55 +512,100 @@ class NonePiece(GamePiece):
         return ""
 
 
+# maps a piece type code to the GamePiece class used when a piece is read back from the array-backed board.
+PIECE_CLASSES = {GENERAL: General, ADVISOR: Advisor, ELEPHANT: Elephant, HORSE: Horse, CHARIOT: Chariot,
+                 CANNON: Cannon, SOLDIER: Soldier}
+
+
 class BoardPoints:
-    """Represents the intersections of the rows and columns on the board."""
-    def __init__(self, row, column):
-        """Initializes private data members: row, column, piece on point as a NonePiece object, occupied as False, and
-        location as a tuple using row and column. The NonePiece object is initialized with color as None, piece type as
-        None, and the row and column being the same as the BoardPoints's."""
+    """Represents the intersections of the rows and columns on the board. A BoardPoints object is a view of one point
+    on the Board's array of piece codes, so reading or changing it reads or changes the Board."""
+    def __init__(self, board, row, column):
+        """Initializes private data members: the board the point belongs to, row, column, the index of the point on
+        the board's array, and location as a tuple using row and column. The last piece object handed out is kept with
+        its code so repeated reads of an unchanged point do not create a new object."""
+        self._board = board
         self._row = row
-        self. column = column
-        self._piece_on_point = NonePiece(None, None, row, column)
-        self._occupied = False
+        self._column = column
+        self._square = square_index(row, column)
         self._location = (row, column)
+        self._cached_code = None
+        self._cached_piece = None
 
     def get_piece_on_point(self):
-        """Returns the piece on the point."""
-        return self._piece_on_point
+        """Returns the piece on the point. Returns a NonePiece object if there is no piece on the point."""
+        code = self._board.get_squares()[self._square]
+        if code != self._cached_code:
+            if code == EMPTY:
+                self._cached_piece = NonePiece(None, None, self._row, self._column)
+            else:
+                self._cached_piece = PIECE_CLASSES[code & TYPE_MASK](COLOR_NAMES[code & COLOR_MASK],
+                                                                     PIECE_TYPE_NAMES[code & TYPE_MASK], self._row,
+                                                                     self._column)
+            self._cached_code = code
+        return self._cached_piece
 
     def set_piece_on_point(self, game_piece_object):
-        """Takes a game piece object and sets piece on point to the game piece. Sets occupied to True"""
-        self._piece_on_point = game_piece_object
-        self._occupied = True
+        """Takes a game piece object and sets piece on point to the game piece. Setting a NonePiece object empties the
+        point."""
+        self._board.place_piece(self._square, game_piece_object.get_piece_code())
 
     def remove_piece_on_point(self, row, column):
-        """Takes a row and a column and sets piece on point to NonePiece with color as None, piece type as None, row
-        as the row argument, and column as the column argument. Sets occupied to False."""
-        self._piece_on_point = NonePiece(None, None, row, column)
-        self._occupied = False
+        """Takes a row and a column and empties the point. The row and column are kept for compatibility, the point
+        already knows its location."""
+        self._board.clear_square(self._square)
 
     def get_location(self):
         """Returns the location."""
         return self._location
 
+    def get_square(self):
+        """Returns the index of the point on the board's array."""
+        return self._square
+
     def is_occupied(self):
-        """Returns data member occupied."""
-        return self._occupied
+        """Returns True if there is a piece on the point, otherwise returns False."""
+        return self._board.get_squares()[self._square] != EMPTY
 
     def set_occupied(self, occupied_status):
-        """Takes either True or False and updates the occupied data member."""
-        self._occupied = occupied_status
+        """Takes either True or False. False empties the point. True has no effect because a point is occupied by
+        setting a piece on it."""
+        if occupied_status is False:
+            self._board.clear_square(self._square)
+
+
+def _has_one_general_each(pieces):
+    """Takes a list of (square, piece code) pairs and returns True if it has exactly one general of each color,
+    otherwise returns False."""
+    codes = [code for square, code in pieces]
+    return codes.count(RED | GENERAL) == 1 and codes.count(BLACK | GENERAL) == 1
 
 
 class Board:
     """Represents a Board"""
 
-    def __init__(self):
-        """Initializes private data member: board as a 9x10 board with a BoardPoints object on each row and column.
-         Adds a piece on the the BoardPoint object at specific locations on the board."""
-        # initialize a 2D array to represent an empty 9x10 board (9 rows, 10 columns) and create a BoardPoints object in
-        # each of the column and row spaces.
-        self._board = [[BoardPoints(rows, columns) for columns in range(0, 9)] for rows in range(0, 10)]
+    def __init__(self, starting_position=True):
+        """Takes an optional starting_position. Initializes private data members: squares as the array of piece codes
+        with a padded border, the squares of each color's pieces and general, the hash and evaluation of the pieces,
+        and board as a 9x10 board of BoardPoints views that is made the first time a point is asked for. Adds a piece
+        at specific locations on the board unless starting_position is False, which leaves the board empty."""
+        # every square starts off the board, then the 10x9 playing area is emptied.
+        self._squares = bytearray([OFF_BOARD]) * BOARD_SIZE
+        for square in BOARD_SQUARES:
+            self._squares[square] = EMPTY
+        # the squares of each color's pieces and general, kept up to date as pieces are placed and cleared.
+        self._piece_squares = {RED: set(), BLACK: set()}
+        self._general_squares = {RED: None, BLACK: None}
+        # the Zobrist hash of the pieces on the board and their evaluation, kept up to date the same way.
+        self._hash = 0
+        self._evaluation = 0
+
+        # the 2D array of BoardPoints views (10 rows, 9 columns) is made by get_board_point when it is first needed,
+        # so boards that are only searched or loaded from FEN do not pay for it.
+        self._board = None
+
+        if starting_position is False:
+            return
 
         # add the pieces on the board at their starting positions.
 
@@ -411,238 +658,831 @@ class Board:
         for row in range(0, 10):
             print("[", end="")
             for column in range(0, 9):
+                piece_name = self.get_piece_name(square_index(row, column))
                 if column == 8:
-                    print(self._board[row][column].get_piece_on_point(), end="")
+                    print(piece_name, end="")
                 elif column == 0:
-                    if isinstance(self._board[row][column].get_piece_on_point(), NonePiece):
-                        print(self._board[row][column].get_piece_on_point(), end=" , ")
+                    if piece_name == "":
+                        print(piece_name, end=" , ")
                     else:
-                        print(self._board[row][column].get_piece_on_point(), end=", ")
+                        print(piece_name, end=", ")
                 else:
-                    print(self._board[row][column].get_piece_on_point(), end=", ")
+                    print(piece_name, end=", ")
             print("]")
 
     def add_piece(self, color, piece_type, row, column):
-        """Takes a color(string), piece_type(string), row(int), and column(int) and adds a specific GamePiece object to
-         the BoardPoint."""
-        add = self._board[row][column].set_piece_on_point
-        if piece_type.lower() == "general":
-            add(General(color, piece_type, row, column))
-        elif piece_type.lower() == "advisor":
-            add(Advisor(color, piece_type, row, column))
-        elif piece_type.lower() == "elephant":
-            add(Elephant(color, piece_type, row, column))
-        elif piece_type.lower() == "horse":
-            add(Horse(color, piece_type, row, column))
-        elif piece_type.lower() == "chariot":
-            add(Chariot(color, piece_type, row, column))
-        elif piece_type.lower() == "cannon":
-            add(Cannon(color, piece_type, row, column))
-        elif piece_type.lower() == "soldier":
-            add(Soldier(color, piece_type, row, column))
-        else:
+        """Takes a color(string), piece_type(string), row(int), and column(int) and adds the piece to the board.
+        Returns False if the piece type is not known, otherwise returns True."""
+        if piece_type.lower() not in PIECE_TYPE_CODES:
             return False
+        self.place_piece(square_index(row, column), COLOR_CODES[color.lower()] | PIECE_TYPE_CODES[piece_type.lower()])
         return True
 
     def get_board_point(self, row, column):
         """Takes a row and column as integers and returns a BoardPoint Object"""
+        if self._board is None:
+            # create a BoardPoints view in each of the column and row spaces.
+            self._board = [[BoardPoints(self, rows, columns) for columns in range(0, 9)] for rows in range(0, 10)]
         return self._board[row][column]
 
+    def get_squares(self):
+        """Returns the array of piece codes. Meant for reading, changes should go through place_piece and
+        clear_square."""
+        return self._squares
+
+    def get_piece_name(self, square):
+        """Takes an index on the board's array and returns the name of the piece there, such as "RED CHARIOT", or an
+        empty string if there is no piece."""
+        code = self._squares[square]
+        if code == EMPTY:
+            return ""
+        return COLOR_NAMES[code & COLOR_MASK].upper() + " " + PIECE_TYPE_NAMES[code & TYPE_MASK].upper()
+
+    def place_piece(self, square, code):
+        """Takes an index on the board's array and a piece code and puts the piece on that square, replacing anything
+        already there. Placing EMPTY clears the square."""
+        if self._squares[square] != EMPTY:
+            self.clear_square(square)
+        if code == EMPTY:
+            return
+        self._squares[square] = code
+        self._piece_squares[code & COLOR_MASK].add(square)
+        self._hash ^= ZOBRIST_KEYS[code][square]
+        self._evaluation += PIECE_SQUARE_VALUES[code][square]
+        if code & TYPE_MASK == GENERAL:
+            self._general_squares[code & COLOR_MASK] = square
+
+    def clear_square(self, square):
+        """Takes an index on the board's array and removes the piece on that square."""
+        code = self._squares[square]
+        if code == EMPTY:
+            return
+        self._squares[square] = EMPTY
+        self._piece_squares[code & COLOR_MASK].discard(square)
+        self._hash ^= ZOBRIST_KEYS[code][square]
+        self._evaluation -= PIECE_SQUARE_VALUES[code][square]
+        if self._general_squares[code & COLOR_MASK] == square:
+            self._general_squares[code & COLOR_MASK] = None
+
+    def move_piece(self, from_square, to_square):
+        """Takes the index a piece moves from and the index it moves to, moves the piece and returns the code of the
+        piece it captured, or EMPTY if there was none."""
+        squares = self._squares
+        code = squares[from_square]
+        captured = squares[to_square]
+        piece_keys = ZOBRIST_KEYS[code]
+        piece_values = PIECE_SQUARE_VALUES[code]
+        # take the captured piece off the board.
+        if captured != EMPTY:
+            self._piece_squares[captured & COLOR_MASK].discard(to_square)
+            self._hash ^= ZOBRIST_KEYS[captured][to_square]
+            self._evaluation -= PIECE_SQUARE_VALUES[captured][to_square]
+            if captured & TYPE_MASK == GENERAL:
+                self._general_squares[captured & COLOR_MASK] = None
+        # move the piece.
+        color = code & COLOR_MASK
+        piece_squares = self._piece_squares[color]
+        piece_squares.discard(from_square)
+        piece_squares.add(to_square)
+        self._hash ^= piece_keys[from_square] ^ piece_keys[to_square]
+        self._evaluation += piece_values[to_square] - piece_values[from_square]
+        if code & TYPE_MASK == GENERAL:
+            self._general_squares[color] = to_square
+        squares[to_square] = code
+        squares[from_square] = EMPTY
+        return captured
+
+    def unmove_piece(self, from_square, to_square, captured):
+        """Takes the squares of a move made with move_piece and the code it returned and takes the move back."""
+        squares = self._squares
+        code = squares[to_square]
+        piece_keys = ZOBRIST_KEYS[code]
+        piece_values = PIECE_SQUARE_VALUES[code]
+        # move the piece back.
+        color = code & COLOR_MASK
+        piece_squares = self._piece_squares[color]
+        piece_squares.discard(to_square)
+        piece_squares.add(from_square)
+        self._hash ^= piece_keys[from_square] ^ piece_keys[to_square]
+        self._evaluation += piece_values[from_square] - piece_values[to_square]
+        if code & TYPE_MASK == GENERAL:
+            self._general_squares[color] = from_square
+        squares[from_square] = code
+        squares[to_square] = captured
+        # put the captured piece back on the board.
+        if captured != EMPTY:
+            self._piece_squares[captured & COLOR_MASK].add(to_square)
+            self._hash ^= ZOBRIST_KEYS[captured][to_square]
+            self._evaluation += PIECE_SQUARE_VALUES[captured][to_square]
+            if captured & TYPE_MASK == GENERAL:
+                self._general_squares[captured & COLOR_MASK] = to_square
+
+    def set_pieces(self, pieces):
+        """Takes a list of (square, piece code) pairs and makes them the only pieces on the board."""
+        for square in self._piece_squares[RED] | self._piece_squares[BLACK]:
+            self.clear_square(square)
+        # the board is empty, so the pieces can be put on it without checking what is on their squares first.
+        squares = self._squares
+        piece_squares = self._piece_squares
+        general_squares = self._general_squares
+        board_hash = self._hash
+        evaluation = self._evaluation
+        for square, code in pieces:
+            squares[square] = code
+            piece_squares[code & COLOR_MASK].add(square)
+            board_hash ^= ZOBRIST_KEYS[code][square]
+            evaluation += PIECE_SQUARE_VALUES[code][square]
+            if code & TYPE_MASK == GENERAL:
+                general_squares[code & COLOR_MASK] = square
+        self._hash = board_hash
+        self._evaluation = evaluation
+
+    def get_fen_placement(self):
+        """Returns the pieces on the board as the first field of a FEN string: the rows from black's side to red's side
+        separated by "/", with a letter for each piece and a digit for each run of empty points."""
+        squares = self._squares
+        ranks = []
+        for row in range(9, -1, -1):
+            rank = ""
+            empty_points = 0
+            for column in range(0, 9):
+                code = squares[square_index(row, column)]
+                if code == EMPTY:
+                    empty_points += 1
+                    continue
+                if empty_points:
+                    rank += str(empty_points)
+                    empty_points = 0
+                letter = FEN_PIECE_LETTERS[code & TYPE_MASK]
+                rank += letter.upper() if code & RED else letter
+            if empty_points:
+                rank += str(empty_points)
+            ranks.append(rank)
+        return "/".join(ranks)
+
+    def set_fen_placement(self, placement):
+        """Takes the first field of a FEN string and puts those pieces on the board in place of the pieces on it.
+        Returns False and leaves the board unchanged if the field does not describe 10 rows of 9 points or does not have
+        exactly one general of each color, otherwise returns True."""
+        ranks = placement.split("/")
+        if len(ranks) != 10:
+            return False
+
+        # read the whole field before changing the board.
+        pieces = []
+        for rank_index, rank in enumerate(ranks):
+            row = 9 - rank_index
+            column = 0
+            for letter in rank:
+                if letter.isdigit():
+                    column += int(letter)
+                    continue
+                piece_type = FEN_PIECE_TYPES.get(letter.lower())
+                if piece_type is None or column > 8:
+                    return False
+                color = RED if letter.isupper() else BLACK
+                pieces.append((square_index(row, column), color | piece_type))
+                column += 1
+            if column != 9:
+                return False
+        if not _has_one_general_each(pieces):
+            return False
+
+        self.set_pieces(pieces)
+        return True
+
+    def get_packed_squares(self):
+        """Returns the pieces on the board packed into PACKED_BOARD_BYTES bytes, one nibble for each point."""
+        squares = self._squares
+        nibbles = PACKED_NIBBLES
+        return bytes([nibbles[squares[first]] << 4 | nibbles[squares[second]]
+                      for first, second in PACKED_SQUARE_PAIRS])
+
+    def set_packed_squares(self, data):
+        """Takes bytes made by get_packed_squares and puts those pieces on the board in place of the pieces on it.
+        Returns False and leaves the board unchanged if the bytes are the wrong length, hold a nibble that is not a
+        piece, or do not have exactly one general of each color, otherwise returns True."""
+        if len(data) != PACKED_BOARD_BYTES:
+            return False
+        codes = PACKED_CODES
+        # read all of the bytes before changing the board.
+        pieces = []
+        for (first, second), byte in zip(PACKED_SQUARE_PAIRS, data):
+            if byte == 0:
+                continue
+            first_code = codes[byte >> 4]
+            second_code = codes[byte & 15]
+            if first_code is None or second_code is None:
+                return False
+            if first_code != EMPTY:
+                pieces.append((first, first_code))
+            if second_code != EMPTY:
+                pieces.append((second, second_code))
+        if not _has_one_general_each(pieces):
+            return False
+
+        self.set_pieces(pieces)
+        return True
+
+    def get_hash(self):
+        """Returns the Zobrist hash of the pieces on the board. Does not include whose turn it is."""
+        return self._hash
+
+    def get_evaluation(self):
+        """Returns the value of the red pieces less the value of the black pieces, counting each piece's value and the
+        bonus for the point it stands on from PIECE_SQUARE_VALUES. Kept up to date as pieces move, like the hash."""
+        return self._evaluation
+
+    def get_piece_squares(self, color):
+        """Takes a color code, RED or BLACK, and returns the set of squares holding that color's pieces. The set is
+        kept up to date by the board, so copy it before changing the board while looping over it."""
+        return self._piece_squares[color]
+
+    def get_general_square(self, color):
+        """Takes a color code, RED or BLACK, and returns the square of that color's general, or None if it is not on
+        the board."""
+        return self._general_squares[color]
+
     def get_red_general_location(self):
         """Returns the location of the red general"""
-        # iterate through the board
-        for row in range(0, 10):
-            for column in range(0, 9):
-                # if the board point is occupied
-                if self.get_board_point(row, column).is_occupied() is True:
-                    # if the piece at the board point is red
-                    if self.get_board_point(row, column).get_piece_on_point().get_game_piece_color() == "red":
-                        # if the piece at the board point is a general type
-                        if self.get_board_point(row, column).get_piece_on_point().get_piece_type() == "general":
-                            return self.get_board_point(row, column).get_location()
+        square = self._general_squares[RED]
+        if square is None:
+            return None
+        return square_row(square), square_column(square)
 
     def get_black_general_location(self):
         """Returns the location of the black general"""
-        # iterate through the board
-        for row in range(0, 10):
-            for column in range(0, 9):
-                # if the board point is occupied
-                if self.get_board_point(row, column).is_occupied() is True:
-                    # if the piece at the board point is black
-                    if self.get_board_point(row, column).get_piece_on_point().get_game_piece_color() == "black":
-                        # if the piece at the board point is a general type
-                        if self.get_board_point(row, column).get_piece_on_point().get_piece_type() == "general":
-                            return self.get_board_point(row, column).get_location()
+        square = self._general_squares[BLACK]
+        if square is None:
+            return None
+        return square_row(square), square_column(square)
+
+
+class PositionCache:
+    """Represents a bounded cache of what is known about positions, such as their legal moves, check status and
+    whether the player to move has any legal move. Positions are keyed by their position hash, and when the cache is
+    full the least recently used position is removed. One cache can be shared by many XiangqiGame objects."""
+
+    def __init__(self, max_positions=4096):
+        """Takes an optional max_positions and initializes private data members: the entries as an ordered dictionary
+        from position hash to a dictionary of values, the maximum number of positions, and the hit and miss counts."""
+        self._entries = OrderedDict()
+        self._max_positions = max_positions
+        self._hits = 0
+        self._misses = 0
+
+    def get_value(self, position_hash, key):
+        """Takes a position hash and a key and returns the value saved for that key in that position, or None if
+        there is none. Counts a hit or a miss and marks the position as recently used."""
+        entry = self._entries.get(position_hash)
+        if entry is None or key not in entry:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(position_hash)
+        self._hits += 1
+        return entry[key]
+
+    def get_first_value(self, position_hash, keys):
+        """Takes a position hash and a sequence of keys and returns a (key, value) pair for the first of the keys that
+        has a value saved in that position, or (None, None) if none of them do. Counts one hit or one miss for the
+        whole lookup and marks the position as recently used."""
+        entry = self._entries.get(position_hash)
+        if entry is not None:
+            for key in keys:
+                if key in entry:
+                    self._entries.move_to_end(position_hash)
+                    self._hits += 1
+                    return key, entry[key]
+        self._misses += 1
+        return None, None
+
+    def set_value(self, position_hash, key, value):
+        """Takes a position hash, a key and a value and saves the value for that key in that position. Removes the
+        least recently used position if the cache is full."""
+        entry = self._entries.get(position_hash)
+        if entry is None:
+            entry = {}
+            self._entries[position_hash] = entry
+            if len(self._entries) > self._max_positions:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(position_hash)
+        entry[key] = value
+
+    def get_hits(self):
+        """Returns the number of lookups that found a saved value."""
+        return self._hits
+
+    def get_misses(self):
+        """Returns the number of lookups that did not find a saved value."""
+        return self._misses
+
+    def get_size(self):
+        """Returns the number of positions in the cache."""
+        return len(self._entries)
+
+    def get_max_positions(self):
+        """Returns the maximum number of positions the cache holds."""
+        return self._max_positions
+
+    def clear(self):
+        """Removes every position from the cache and resets the hit and miss counts."""
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
 
 
 class XiangqiGame:
     """Represents a Xiangqi game."""
 
-    def __init__(self):
-        """Initializes private data members: game_state as "UNFINISHED", game_board as a Board object, and players
-        turn as "red"."""
+    def __init__(self, defer_game_state=False, position_cache=None, board=None):
+        """Takes an optional defer_game_state, an optional PositionCache and an optional Board to play on. Initializes
+        private data members: game_state as "UNFINISHED", game_board as the given Board or a new Board object with the
+        pieces at their starting positions, players turn as "red", an empty undo stack for the moves made with push,
+        defer_game_state, the position cache, and the position history: a stack of the hashes of the positions so far
+        and a dictionary of the number of times each hash is in it. When defer_game_state is True, make_move does not
+        look for checkmate, stalemate or repetition until the game state is read. When a position cache is given,
+        legal moves, valid moves, check status and checkmate tests are saved in it and reused for positions seen
+        before."""
         self._game_state = "UNFINISHED"
-        self._game_board = Board()
+        if board is None:
+            board = Board()
+        self._game_board = board
         self._players_turn = "red"
+        self._undo_stack = []
+        self._defer_game_state = defer_game_state
+        self._position_cache = position_cache
+        self._position_history = []
+        self._position_counts = {}
+        self.clear_position_history()
+
+    @classmethod
+    def from_fen(cls, fen, defer_game_state=False, position_cache=None):
+        """Takes a position as a FEN string, and optionally defer_game_state and a PositionCache as for a new game, and
+        returns a XiangqiGame with that position and side to move. The side to move is "w" or "r" for red and "b" for
+        black, and red moves if it is left out. The move counters are not used. Returns None if the FEN is not valid
+        or does not have exactly one general of each color. The board is built directly, and whether the game is over
+        is not checked until the game state is read."""
+        fields = fen.split()
+        if not fields:
+            return None
+        side_to_move = fields[1].lower() if len(fields) > 1 else "w"
+        if side_to_move not in ("w", "r", "b"):
+            return None
+
+        board = Board(starting_position=False)
+        if board.set_fen_placement(fields[0]) is False:
+            return None
+
+        game = cls(defer_game_state, position_cache, board)
+        game.set_players_turn("black" if side_to_move == "b" else "red")
+        return game
+
+    def to_fen(self):
+        """Returns the position as a FEN string: the pieces, "w" if it is red's turn or "b" if it is black's turn, and
+        move counters of "- - 0 1" because the game does not keep them."""
+        side_to_move = "w" if self._players_turn == "red" else "b"
+        return self._game_board.get_fen_placement() + " " + side_to_move + " - - 0 1"
+
+    @classmethod
+    def from_bytes(cls, data, defer_game_state=False, position_cache=None):
+        """Takes a position made by to_bytes, and optionally defer_game_state and a PositionCache as for a new game, and
+        returns a XiangqiGame with that position and side to move. Returns None if the bytes are not a position or do
+        not have exactly one general of each color. The board is built directly, and whether the game is over is not
+        checked until the game state is read."""
+        if len(data) != PACKED_POSITION_BYTES or data[PACKED_BOARD_BYTES] not in (0, 1):
+            return None
+        board = Board(starting_position=False)
+        if board.set_packed_squares(data[:PACKED_BOARD_BYTES]) is False:
+            return None
+
+        game = cls(defer_game_state, position_cache, board)
+        game.set_players_turn("black" if data[PACKED_BOARD_BYTES] == 1 else "red")
+        return game
+
+    def to_bytes(self):
+        """Returns the position as PACKED_POSITION_BYTES bytes: the pieces packed one nibble for each point, then a
+        byte that is 0 if it is red's turn or 1 if it is black's turn."""
+        side_to_move = b"\x01" if self._players_turn == "black" else b"\x00"
+        return self._game_board.get_packed_squares() + side_to_move
 
     def display_game_board(self):
         """Returns the game board object calling its display_board method. This returns a printed board."""
         return self._game_board.display_board()
 
+    def get_game_board(self):
+        """Returns the Board object the game is played on."""
+        return self._game_board
+
+    def get_players_turn(self):
+        """Returns the color of the player whose turn it is: either "red" or "black"."""
+        return self._players_turn
+
+    def set_players_turn(self, color):
+        """Takes a color: either "red" or "black", and makes it that player's turn. Meant for setting up a position,
+        so the position history is started over from it and the game state is worked out again the next time it is
+        read. Returns False if the color is not known, otherwise returns True."""
+        if color.lower() not in COLOR_CODES:
+            return False
+        self._players_turn = color.lower()
+        self.clear_position_history()
+        # a game state of None is worked out the first time it is read.
+        self._game_state = None
+        return True
+
     def get_game_state(self):
-        """Returns the state of the game. Will either be "UNFINISHED", "RED_WON", or "BLACK_WON"."""
+        """Returns the state of the game. Will either be "UNFINISHED", "RED_WON", "BLACK_WON", or "DRAW"."""
+        # a game state of None means a move was made with the game state deferred and it has not been checked yet.
+        if self._game_state is None:
+            self.update_game_state()
         return self._game_state
 
+    def get_position_cache(self):
+        """Returns the PositionCache used by the game, or None if it does not use one."""
+        return self._position_cache
+
+    def set_position_cache(self, position_cache):
+        """Takes a PositionCache, or None to stop using one, and uses it for the rest of the game."""
+        self._position_cache = position_cache
+
+    def position_hash(self):
+        """Returns a 64-bit Zobrist hash of the position: the pieces on the board and whose turn it is. Equal positions
+        have equal hashes, and the hash is updated as moves are made and taken back instead of being recomputed."""
+        if self._players_turn == "black":
+            return self._game_board.get_hash() ^ ZOBRIST_BLACK_TO_MOVE
+        return self._game_board.get_hash()
+
     def make_move(self, move_from, move_to):
         """Takes a string algebraic notation and returns True if the move is made and moves the piece and False if the
         move can't be made. If the move leaves the opponent in a checkmate or stalemate. Changes the game status."""
-
-        list_of_column_positions = ["a", "b", "c", "d", "e", "f", "g", "h", "i"]
-        list_of_row_positions = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10"]
-
-        if self._game_state != "UNFINISHED":
-            return False
-        # if the algebraic notation for the column is not on the board.
-        if move_to[0].lower() not in list_of_column_positions or move_from[0].lower() not in list_of_column_positions:
-            return False
-        # if the algebraic notation for the row is not on the board.
-        elif move_to[1:].lower() not in list_of_row_positions or move_from[1:].lower() not in list_of_row_positions:
+        # a game state of None is left for get_game_state to work out. A player who is checkmated or stalemated has no
+        # move that is_legal_move allows, so only a repetition has to be looked for before the move.
+        if self._game_state is None:
+            repetition_result = self.find_repetition_result()
+            if repetition_result is not None:
+                self._game_state = repetition_result
+                return False
+        elif self._game_state != "UNFINISHED":
             return False
 
-        # translate algebraic notation to row and column index
-        row_move_from_index = list_of_row_positions.index(move_from[1:])
-        column_move_from_index = list_of_column_positions.index(move_from.lower()[0])
-        row_move_to_index = list_of_row_positions.index(move_to[1:])
-        column_move_to_index = list_of_column_positions.index(move_to.lower()[0])
-
-        # if there is no piece to get valid moves from.
-        if self._game_board.get_board_point(row_move_from_index, column_move_from_index).is_occupied() is False:
+        # translate algebraic notation to indexes on the board. The notation is not on the board if it is not found.
+        from_square = ALGEBRAIC_SQUARES.get(str(move_from).lower())
+        to_square = ALGEBRAIC_SQUARES.get(str(move_to).lower())
+        if from_square is None or to_square is None:
             return False
 
-        move_from_game_piece = self._game_board.get_board_point(row_move_from_index, column_move_from_index).\
-            get_piece_on_point()
-
-        # if the piece color that is attempting the move not the same as the players turn.
-        if move_from_game_piece.get_game_piece_color() != self._players_turn:
+        move = encode_move(from_square, to_square)
+        if self.is_legal_move(move) is False:
             return False
 
-        # get the piece's move list from get_valid_moves method.
-        valid_move_list = self.get_valid_moves(row_move_from_index, column_move_from_index)
+        self.push(move)
 
-        if valid_move_list is False:
+        # check if the player who moves next is in checkmate or stalemate, or leave it until the game state is read.
+        if self._defer_game_state is True:
+            self._game_state = None
+        else:
+            self.update_game_state()
+        return True
+
+    def push(self, move):
+        """Takes a move encoded by encode_move and makes it for the player whose turn it is, then changes the players
+        turn. Saves what is needed to take the move back with pop. Does not check that the move is legal or update the
+        game state, so it is cheap enough for trying moves."""
+        from_square = move >> 8
+        to_square = move & 255
+        captured = self._game_board.move_piece(from_square, to_square)
+        # the undo record is the move, the captured piece code, and the game state before the move.
+        self._undo_stack.append((move, captured, self._game_state))
+        if self._players_turn == "red":
+            self._players_turn = "black"
+        else:
+            self._players_turn = "red"
+        # add the new position to the history.
+        position_hash = self.position_hash()
+        self._position_history.append(position_hash)
+        self._position_counts[position_hash] = self._position_counts.get(position_hash, 0) + 1
+
+    def pop(self):
+        """Takes back the last move made with push or make_move and returns it. Returns False if there are no moves to
+        take back."""
+        if not self._undo_stack:
             return False
-        # if black is already in check and the piece making the move is black.
-        elif self.is_in_check("black") is True and move_from_game_piece.get_game_piece_color() == "black":
-            # check if the black general will still be in check after moving using test_move_in_check method.
-            valid_move_list = self.test_move_in_check(row_move_from_index, column_move_from_index, valid_move_list)
-            if (row_move_to_index, column_move_to_index) in valid_move_list:
-                # move game piece to new position
-                self._game_board.get_board_point(row_move_to_index, column_move_to_index).\
-                    set_piece_on_point(move_from_game_piece)
-                # update the game piece location to the new position
-                self._game_board.get_board_point(row_move_to_index, column_move_to_index).get_piece_on_point().\
-                    set_location(row_move_to_index, column_move_to_index)
-                # remove game piece from old position
-                self._game_board.get_board_point(row_move_from_index, column_move_from_index).\
-                    remove_piece_on_point(row_move_from_index, column_move_from_index)
-
-                # change the players turn to red after the move is made.
-                self._players_turn = "red"
-                return True
+        move, captured, game_state = self._undo_stack.pop()
+        # take the position off the history, unless it is the position the history was started over from.
+        history_cleared = len(self._position_history) == 1
+        if not history_cleared:
+            position_hash = self._position_history.pop()
+            if self._position_counts[position_hash] == 1:
+                del self._position_counts[position_hash]
             else:
-                return False
-        # if red is already in check and the piece making the move is red.
-        elif self.is_in_check("red") is True and move_from_game_piece.get_game_piece_color() == "red":
-            # check if the red general will still be in check after moving using test_move_in_check method.
-            valid_move_list = self.test_move_in_check(row_move_from_index, column_move_from_index, valid_move_list)
-            if (row_move_to_index, column_move_to_index) in valid_move_list:
-                # move game piece to new position
-                self._game_board.get_board_point(row_move_to_index, column_move_to_index).\
-                    set_piece_on_point(move_from_game_piece)
-                # update the game piece location to the new position
-                self._game_board.get_board_point(row_move_to_index, column_move_to_index).get_piece_on_point().\
-                    set_location(row_move_to_index, column_move_to_index)
-                # remove game piece from old position
-                self._game_board.get_board_point(row_move_from_index, column_move_from_index).\
-                    remove_piece_on_point(row_move_from_index, column_move_from_index)
-
-                # change the players turn to black after the move is made.
-                self._players_turn = "black"
-                return True
-            else:
-                return False
-        # if the move is valid and no one is in check.
-        elif (row_move_to_index, column_move_to_index) in valid_move_list:
-            # move game piece to new position
-            self._game_board.get_board_point(row_move_to_index, column_move_to_index).\
-                set_piece_on_point(move_from_game_piece)
-            # update the game piece location to the new position
-            self._game_board.get_board_point(row_move_to_index, column_move_to_index).get_piece_on_point().\
-                set_location(row_move_to_index, column_move_to_index)
-            # remove game piece from old position
-            self._game_board.get_board_point(row_move_from_index, column_move_from_index).\
-                remove_piece_on_point(row_move_from_index, column_move_from_index)
-
-            if self._players_turn == "red":
-                self._players_turn = "black"
-            elif self._players_turn == "black":
-                self._players_turn = "red"
-
-            # check for checkmate and stalemate
-            if move_from_game_piece.get_game_piece_color() == "red":
-                # Checking for checkmate, if after doing the move, it makes the other general in check.
-                is_checkmate_or_stalemate = None
-                # test all the moves that the black pieces have
-                for row in range(0, 10):
-                    for column in range(0, 9):
-                        if self._game_board.get_board_point(row, column).is_occupied() is True:
-                            if self._game_board.get_board_point(row, column).get_piece_on_point(). \
-                                    get_game_piece_color() == "black":
-                                # test that piece's moves to see if after they do the move, is the black general in
-                                # check using test_move_game_won method.
-                                is_checkmate_or_stalemate = self.test_move_game_won(row, column, self.get_valid_moves(
-                                    row, column))
-                                # if there are some valid moves that don't put black general in check.
-                                if is_checkmate_or_stalemate is False:
-                                    return True
-                                else:
-                                    continue
-                    # if after the loop and is_checkmate is True then it means there are no moves that black can do
-                    # that will not put the black general in check, meaning checkmate or stalemate.
-                if is_checkmate_or_stalemate is True:
-                    self._game_state = "RED_WON"
-                    return True
-            elif move_from_game_piece.get_game_piece_color() == "black":
-                is_checkmate_or_stalemate = None
-                # test all the moves that the red pieces have
-                for row in range(0, 10):
-                    for column in range(0, 9):
-                        if self._game_board.get_board_point(row, column).is_occupied() is True:
-                            if self._game_board.get_board_point(row, column).get_piece_on_point().\
-                                    get_game_piece_color() == "red":
-                                # test that piece's moves to see if after they do the move, is the red general in
-                                # check using test_move_game_won method.
-                                is_checkmate_or_stalemate = self.test_move_game_won(row, column, self.get_valid_moves(
-                                    row, column))
-                                if is_checkmate_or_stalemate is False:
-                                    # means there are some valid moves that don't put red general in check.
-                                    return True
-                                else:
-                                    continue
-                    # if after the loop and is_checkmate is True then it means there are no moves that red can do
-                    # that will not put the red general in check, meaning checkmate or stalemate.
-                if is_checkmate_or_stalemate is True:
-                    self._game_state = "BLACK_WON"
-                    return True
-        # if the move is not in the valid moves list.
+                self._position_counts[position_hash] -= 1
+        self._game_board.unmove_piece(move >> 8, move & 255, captured)
+        self._game_state = game_state
+        if self._players_turn == "red":
+            self._players_turn = "black"
         else:
+            self._players_turn = "red"
+        # taking back a move made before the history was started over starts it over again from this position.
+        if history_cleared:
+            self.clear_position_history()
+        return move
+
+    def pop_all(self):
+        """Takes back every move made with push or make_move, so the game is back at the position it started from.
+        Returns the number of moves taken back."""
+        move_count = 0
+        while self.pop() is not False:
+            move_count += 1
+        return move_count
+
+    def clear_position_history(self):
+        """Starts the position history over from the current position. Moves made before are not counted for
+        repetitions, though they can still be taken back with pop, which starts the history over from each position
+        it takes back to."""
+        position_hash = self.position_hash()
+        self._position_history = [position_hash]
+        self._position_counts = {position_hash: 1}
+
+    def get_repetition_count(self):
+        """Returns the number of times the current position has come up in the position history, counting this time.
+        Positions are the same when the same pieces are on the same points with the same player to move."""
+        if not self._position_history:
+            return 0
+        return self._position_counts.get(self._position_history[-1], 0)
+
+    def find_repetition_result(self):
+        """Returns the result of a repeated position, or None if the current position has not come up REPETITION_LIMIT
+        times. Looks at the moves since the position last came up: if one player gave check with every one of their
+        moves and the other player did not, the player giving perpetual check loses, otherwise the game is a draw.
+        Returns "RED_WON", "BLACK_WON" or "DRAW". Perpetual chasing of pieces other than the general is not
+        judged."""
+        if self.get_repetition_count() < REPETITION_LIMIT:
+            return None
+        # find where the position came up before.
+        position_hash = self._position_history[-1]
+        cycle_length = 1
+        while self._position_history[-1 - cycle_length] != position_hash:
+            cycle_length += 1
+        # the history can be shorter than the undo stack after clear_position_history, but never longer, and the
+        # cycle is all in the history so taking it back never goes past where the history was started over.
+        cycle_moves = []
+        for _move_number in range(0, cycle_length):
+            cycle_moves.append(self.pop())
+        # make the moves again, noting whether each one gives check.
+        checks_given = {"red": [], "black": []}
+        for move in reversed(cycle_moves):
+            mover = self._players_turn
+            self.push(move)
+            checks_given[mover].append(self.is_in_check(self._players_turn))
+        red_checks = len(checks_given["red"]) > 0 and all(checks_given["red"])
+        black_checks = len(checks_given["black"]) > 0 and all(checks_given["black"])
+        if red_checks and not black_checks:
+            return "BLACK_WON"
+        if black_checks and not red_checks:
+            return "RED_WON"
+        return "DRAW"
+
+    def is_legal_move(self, move):
+        """Takes a move encoded by encode_move and returns True if the player whose turn it is can make it, otherwise
+        returns False. The move must be one of the piece's moves and must not leave their own general in check or
+        facing the other general."""
+        board = self._game_board
+        from_square = move_from_square(move)
+        to_square = move_to_square(move)
+        color_code = COLOR_CODES[self._players_turn]
+
+        # if the piece color that is attempting the move is not the same as the players turn.
+        if not board.get_squares()[from_square] & color_code:
             return False
+        if to_square not in self.get_piece_moves(from_square):
+            return False
+
+        # try the move and take it back.
+        captured = board.move_piece(from_square, to_square)
+        is_legal = not self.is_general_exposed(color_code)
+        board.unmove_piece(from_square, to_square, captured)
+        return is_legal
+
+    def legal_moves(self, color=None):
+        """Takes an optional color: either "red" or "black", and returns a list of all the moves that color can make
+        without leaving their general in check or facing the other general. Uses the player whose turn it is if no
+        color is given. Each move is encoded by encode_move."""
+        board = self._game_board
+        if color is None:
+            color = self._players_turn
+        color_code = COLOR_CODES[color.lower()]
+
+        # use the saved moves if this position has been seen before. A copy is returned so the saved list can't be
+        # changed by the caller.
+        if self._position_cache is not None:
+            moves = self._position_cache.get_value(self.position_hash(), ("legal_moves", color_code))
+            if moves is not None:
+                return list(moves)
+
+        moves = list(self.generate_legal_moves(color_code))
+        if self._position_cache is not None:
+            self._position_cache.set_value(self.position_hash(), ("legal_moves", color_code), tuple(moves))
+        return moves
+
+    def legal_captures(self, color=None):
+        """Takes an optional color: either "red" or "black", and returns a list of the legal moves of that color that
+        capture a piece. Uses the player whose turn it is if no color is given. Only the captures are tried, so this
+        is quicker than filtering legal_moves. Each move is encoded by encode_move."""
+        if color is None:
+            color = self._players_turn
+        return list(self.generate_legal_moves(COLOR_CODES[color.lower()], True))
+
+    def generate_legal_moves(self, color_code, captures_only=False):
+        """Takes a color code, RED or BLACK, and optionally True to only generate captures. Yields each legal move of
+        that color encoded by encode_move, by the squares the pieces move from in order. The checks and pins are found
+        first: when the general is not in check only the general's moves, the moves of pinned pieces and the moves
+        onto a cannon's line are tried on the board, and when it is in check only the moves that could answer every
+        check are tried."""
+        board = self._game_board
+        squares = board.get_squares()
+        enemy_color_code = color_code ^ COLOR_MASK
+        general_square = board.get_general_square(color_code)
+        checks, pinned_squares, screen_squares = self.find_checks_and_pins(color_code)
+
+        # the squares are copied because trying the moves changes the board.
+        for from_square in sorted(board.get_piece_squares(color_code)):
+            for to_square in self.get_piece_moves(from_square):
+                if captures_only and not squares[to_square] & enemy_color_code:
+                    continue
+                if from_square != general_square:
+                    if checks:
+                        # a move that does not capture, block or move away the screen of every check can't be legal.
+                        if not all(to_square in to_squares or from_square in from_squares
+                                   for to_squares, from_squares in checks):
+                            continue
+                    elif from_square not in pinned_squares and to_square not in screen_squares:
+                        yield from_square << 8 | to_square
+                        continue
+                # try the move and keep it if their own general is safe afterwards.
+                captured = board.move_piece(from_square, to_square)
+                is_legal = not self.is_general_exposed(color_code)
+                board.unmove_piece(from_square, to_square, captured)
+                if is_legal:
+                    yield from_square << 8 | to_square
+
+    def find_checks_and_pins(self, color_code):
+        """Takes a color code, RED or BLACK, and returns a tuple of the checks against that color's general, the
+        squares of its pinned pieces, and the squares a piece could move onto to become the screen of an enemy cannon.
+        Each check is a pair of the set of squares a piece other than the general could move to to answer it, by
+        capturing the checking piece or blocking it, and the set of squares a piece could move away from to answer it,
+        the cannon's screen. A pinned piece is one that would leave the general attacked or facing the other general if
+        it moved off its line. Returns no checks or pins if the color has no general."""
+        board = self._game_board
+        squares = board.get_squares()
+        general_square = board.get_general_square(color_code)
+        checks = []
+        pinned_squares = set()
+        screen_squares = set()
+        if general_square is None:
+            return checks, pinned_squares, screen_squares
+
+        enemy_color_code = color_code ^ COLOR_MASK
+        # the other general attacks along the column like a chariot, the generals can never share a row.
+        line_attackers = (enemy_color_code | CHARIOT, enemy_color_code | GENERAL)
+        cannon = enemy_color_code | CANNON
+        for step in ORTHOGONAL_STEPS:
+            # find the first three pieces along the line and the empty points before each of them.
+            pieces = []
+            empty_squares = []
+            square = general_square + step
+            while len(pieces) < 3:
+                while squares[square] == EMPTY:
+                    empty_squares.append(square)
+                    square += step
+                if squares[square] == OFF_BOARD:
+                    break
+                pieces.append((square, len(empty_squares)))
+                square += step
+            if not pieces:
+                continue
+
+            first_square = pieces[0][0]
+            first_code = squares[first_square]
+            if first_code in line_attackers:
+                checks.append((set(empty_squares[:pieces[0][1]]) | {first_square}, set()))
+                continue
+            # a piece moved between the general and an enemy cannon becomes its screen.
+            if first_code == cannon:
+                screen_squares.update(empty_squares[:pieces[0][1]])
+            if len(pieces) < 2:
+                continue
+            second_square = pieces[1][0]
+            second_code = squares[second_square]
+            if second_code == cannon:
+                checks.append((set(empty_squares[:pieces[1][1]]) | {second_square}, {first_square}))
+                continue
+            first_is_friend = first_code & color_code
+            # moving the first piece away lets the second attack like a chariot.
+            if first_is_friend and second_code in line_attackers:
+                pinned_squares.add(first_square)
+            # moving the first or second piece away lets the third attack like a cannon.
+            if len(pieces) == 3 and squares[pieces[2][0]] == cannon:
+                if first_is_friend:
+                    pinned_squares.add(first_square)
+                if second_code & color_code:
+                    pinned_squares.add(second_square)
+
+        # a horse attacks the general if its leg is empty, and the piece on its leg is pinned otherwise.
+        horse = enemy_color_code | HORSE
+        for attacker_square, leg_square in HORSE_ATTACKS[general_square]:
+            if squares[attacker_square] == horse:
+                if squares[leg_square] == EMPTY:
+                    checks.append(({attacker_square, leg_square}, set()))
+                elif squares[leg_square] & color_code:
+                    pinned_squares.add(leg_square)
+        soldier = enemy_color_code | SOLDIER
+        for attacker_square in SOLDIER_ATTACKS[enemy_color_code][general_square]:
+            if squares[attacker_square] == soldier:
+                checks.append(({attacker_square}, set()))
+        # advisors and elephants can't leave their own palace or half of the board, so they never attack the general.
+        return checks, pinned_squares, screen_squares
+
+    def perft(self, depth):
+        """Takes a depth and returns the number of move sequences of that many moves that can be played from the
+        position, counting the legal moves at every ply. The position is the same afterwards. Known counts for test
+        positions make this a check of the move generator and a measure of its speed."""
+        if depth <= 0:
+            return 1
+        moves = self.legal_moves()
+        # the moves at the last ply are counted without being made.
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.push(move)
+            nodes += self.perft(depth - 1)
+            self.pop()
+        return nodes
+
+    def is_general_exposed(self, color_code):
+        """Takes a color code, RED or BLACK, and returns True if that color's general is attacked or is facing the
+        other general on the same column with no pieces between them, otherwise returns False."""
+        board = self._game_board
+        general_square = board.get_general_square(color_code)
+        other_general_square = board.get_general_square(color_code ^ COLOR_MASK)
+        if general_square is None:
+            return False
+        if self.is_square_attacked(general_square, color_code ^ COLOR_MASK):
+            return True
+        if other_general_square is None or (general_square - other_general_square) % BOARD_WIDTH != 0:
+            return False
+        # look at the points between the generals.
+        squares = board.get_squares()
+        step = DOWN if general_square < other_general_square else UP
+        square = general_square + step
+        while squares[square] == EMPTY:
+            square += step
+        return square == other_general_square
+
+    def update_game_state(self):
+        """Checks if the position has come up REPETITION_LIMIT times, in which case the game is a draw or is lost by the
+        player giving perpetual check. Otherwise checks if the player whose turn it is has any move that does not leave
+        their general in check. If they do not, it is checkmate or stalemate and the other player has won, so the game
+        state is changed."""
+        repetition_result = self.find_repetition_result()
+        if repetition_result is not None:
+            self._game_state = repetition_result
+        elif self.has_legal_move(COLOR_CODES[self._players_turn]):
+            self._game_state = "UNFINISHED"
+        elif self._players_turn == "black":
+            self._game_state = "RED_WON"
+        else:
+            self._game_state = "BLACK_WON"
+
+    def has_legal_move(self, color_code):
+        """Takes a color code, RED or BLACK, and returns True if that color has at least one legal move, otherwise
+        returns False. Stops at the first legal move found."""
+        if self._position_cache is not None:
+            position_hash = self.position_hash()
+            # the full list of legal moves answers the question too. Both are looked up at once so the question counts
+            # as one hit or one miss.
+            legal_moves_key = ("legal_moves", color_code)
+            has_move_key = ("has_legal_move", color_code)
+            key, value = self._position_cache.get_first_value(position_hash, (legal_moves_key, has_move_key))
+            if key == legal_moves_key:
+                return len(value) > 0
+            if key == has_move_key:
+                return value
+            has_move = self.find_legal_move(color_code)
+            self._position_cache.set_value(position_hash, has_move_key, has_move)
+            return has_move
+        return self.find_legal_move(color_code)
+
+    def find_legal_move(self, color_code):
+        """Takes a color code, RED or BLACK, and returns True if that color has at least one legal move, otherwise
+        returns False. Stops at the first legal move found and does not use the position cache."""
+        for _move in self.generate_legal_moves(color_code):
+            return True
+        return False
 
     def get_valid_moves(self, row_move_from_index, column_move_from_index):
         """Takes two parameters a row index moving from, a column index moving from, returns a list of valid moves.
         Note: does not check for if the move will cause a check."""
-        valid_moves = []
-
         # if the move from or move to is out of range.
         if row_move_from_index not in range(0, 10):
             return False
@@ -650,963 +1490,233 @@ class XiangqiGame:
         elif column_move_from_index not in range(0, 9):
             return False
 
+        from_square = square_index(row_move_from_index, column_move_from_index)
         # if there is no piece to get valid moves from.
-        if self._game_board.get_board_point(row_move_from_index, column_move_from_index).is_occupied() is False:
+        if self._game_board.get_squares()[from_square] == EMPTY:
             return False
 
-        move_from_game_piece = self._game_board.get_board_point(row_move_from_index, column_move_from_index).\
-            get_piece_on_point()
-
-        # if the game piece is a general or advisor.
-        if isinstance(move_from_game_piece, General) or isinstance(move_from_game_piece, Advisor):
-            # get the list of possible moves from the piece's possible moves method.
-            list_of_possible_moves = move_from_game_piece.possible_moves()
-
-            for coordinates in list_of_possible_moves:
-                # if the space is not occupied.
-                if self._game_board.get_board_point(coordinates[0], coordinates[1]).is_occupied() is False:
-                    # add the coordinates to the valid moves list.
-                    valid_moves.append(coordinates)
-                # if the space is occupied.
-                else:
-                    # if the piece color on the point is the saame as the piece moving.
-                    if self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point().\
-                            get_game_piece_color() == move_from_game_piece.get_game_piece_color():
-                        continue
-                    else:
-                        # add the coordinates to the valid moves list.
-                        valid_moves.append(coordinates)
-
-            # test if the valid moves list will cause general seeing general.
-            valid_moves = self.will_general_see_general(row_move_from_index, column_move_from_index, valid_moves)
-
-            return valid_moves
-
-        # if the game piece is an elephant piece.
-        if isinstance(move_from_game_piece, Elephant):
-            # get the list of possible moves from the piece's possible moves method.
-            list_of_possible_moves = move_from_game_piece.possible_moves()
-
-            # first check all four diagonal points away from the current position.
-            for row_number in range(-1, 2):
-                for column_number in range(-1, 2):
-                    if row_number == 0 or column_number == 0:
-                        continue
-                    else:
-                        adjacent_row = row_move_from_index + row_number
-                        adjacent_column = column_move_from_index + column_number
-
-                        # check if the adjacent diagonal position is occupied.
-                        if adjacent_row in range(0, 10) and adjacent_column in range(0, 9):
-                            # if the adjacent diagonal position is occupied.
-                            if self._game_board.get_board_point(adjacent_row, adjacent_column).is_occupied() is True:
-                                # get the next diagonal point from the occupied point
-                                adjacent_row = adjacent_row + row_number
-                                adjacent_column = adjacent_column + column_number
-                                if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                                    # remove the points that are blocked in the list_of_possible_moves
-                                    list_of_possible_moves.remove((adjacent_row, adjacent_column))
-                            else:
-                                continue
-                        else:
-                            continue
+        # use the saved moves if this position has been seen before.
+        if self._position_cache is not None:
+            valid_moves = self._position_cache.get_value(self.position_hash(), ("valid_moves", from_square))
+            if valid_moves is not None:
+                return list(valid_moves)
+
+        valid_moves = [(square_row(to_square), square_column(to_square))
+                       for to_square in self.get_piece_moves(from_square)]
+
+        # test if the moves in the valid moves list will cause general seeing general.
+        valid_moves = self.will_general_see_general(row_move_from_index, column_move_from_index, valid_moves)
+        if self._position_cache is not None:
+            self._position_cache.set_value(self.position_hash(), ("valid_moves", from_square), tuple(valid_moves))
+        return valid_moves
+
+    def get_piece_moves(self, from_square):
+        """Takes an index on the board's array and returns a list of the indexes the piece on that square can move to.
+        Note: does not check for general seeing general or if the move will cause a check."""
+        squares = self._game_board.get_squares()
+        piece_code = squares[from_square]
+        piece_type = piece_code & TYPE_MASK
+        # the color bits of the side moving and of the other side.
+        friend = piece_code & COLOR_MASK
+        enemy = friend ^ COLOR_MASK
+        valid_moves = []
 
-            # now check if the actual move to points is occupied.
-            for coordinates in list_of_possible_moves:
-                # if the space is not occupied.
-                if self._game_board.get_board_point(coordinates[0], coordinates[1]).is_occupied() is False:
-                    valid_moves.append(coordinates)
-                # if the space is occupied.
-                else:
-                    # if the piece color on the space is the same as the piece that is doing the move.
-                    if self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point().\
-                            get_game_piece_color() == move_from_game_piece.get_game_piece_color():
+        if piece_type == CHARIOT:
+            for ray in ORTHOGONAL_RAYS[from_square]:
+                # slide until the first piece, which can be captured if it is an enemy.
+                for to_square in ray:
+                    code = squares[to_square]
+                    if code == EMPTY:
+                        valid_moves.append(to_square)
                         continue
-                    else:
-                        # add the space to the valid moves list.
-                        valid_moves.append(coordinates)
-
-            # test if the moves in the valid moves list will cause general seeing general.
-            valid_moves = self.will_general_see_general(row_move_from_index, column_move_from_index, valid_moves)
-
-            return valid_moves
-
-        # if the game piece is a horse piece.
-        if isinstance(move_from_game_piece, Horse):
-            # get the list of possible moves from the piece's possible moves method.
-            list_of_possible_moves = move_from_game_piece.possible_moves()
-
-            # check if the point on the right is blocking
-            column_number = 1
-            adjacent_column = column_move_from_index + column_number
-            if adjacent_column in range(0, 9):
-                if self._game_board.get_board_point(row_move_from_index, adjacent_column).is_occupied() is True:
-                    # the move that is blocked
-                    adjacent_row = row_move_from_index + 1
-                    adjacent_column = adjacent_column + column_number
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-                    # the move that is blocked
-                    adjacent_row = row_move_from_index - 1
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-
-            # check if the point on the left is blocking
-            column_number = -1
-            adjacent_column = column_move_from_index + column_number
-            if adjacent_column in range(0, 9):
-                if self._game_board.get_board_point(row_move_from_index, adjacent_column).is_occupied() is True:
-                    # the move that is blocked
-                    adjacent_row = row_move_from_index + 1
-                    adjacent_column = adjacent_column + column_number
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-                    # the move that is blocked
-                    adjacent_row = row_move_from_index - 1
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-
-            # check if the point on top is blocking
-            row_number = -1
-            adjacent_row = row_move_from_index + row_number
-            if adjacent_row in range(0, 10):
-                if self._game_board.get_board_point(adjacent_row, column_move_from_index).is_occupied() is True:
-                    # the move that is blocked
-                    adjacent_row = adjacent_row + row_number
-                    adjacent_column = column_move_from_index + 1
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-                    # the move that is blocked
-                    adjacent_column = column_move_from_index - 1
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-
-            # check if the point on the bottom is blocking
-            row_number = 1
-            adjacent_row = row_move_from_index + row_number
-            if adjacent_row in range(0, 10):
-                if self._game_board.get_board_point(adjacent_row, column_move_from_index).is_occupied() is True:
-                    # the move that is blocked
-                    adjacent_row = adjacent_row + row_number
-                    adjacent_column = column_move_from_index + 1
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-                    # the move that is blocked
-                    adjacent_column = column_move_from_index - 1
-                    if (adjacent_row, adjacent_column) in list_of_possible_moves:
-                        list_of_possible_moves.remove((adjacent_row, adjacent_column))
-
-            # now check if the actual move to points is occupied.
-            for coordinates in list_of_possible_moves:
-                # if the space is not occupied.
-                if self._game_board.get_board_point(coordinates[0], coordinates[1]).is_occupied() is False:
-                    # add coordinates to the valid moves list.
-                    valid_moves.append(coordinates)
-                # if the space is occupied
-                else:
-                    # if the piece color on the space is the same as the piece that is doing the move.
-                    if self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point().\
-                            get_game_piece_color() == move_from_game_piece.get_game_piece_color():
-                        continue
-                    else:
-                        # add coordinates to the valid moves list.
-                        valid_moves.append(coordinates)
-
-            # test if the moves in the valid moves list will cause general seeing general.
-            valid_moves = self.will_general_see_general(row_move_from_index, column_move_from_index, valid_moves)
-
-            return valid_moves
-
-        if isinstance(move_from_game_piece, Chariot):
-
-            # all possible moves up
-            adjacent_row_up = row_move_from_index - 1
-            while adjacent_row_up >= 0:
-                # if the space is not occupied.
-                if self._game_board.get_board_point(adjacent_row_up, column_move_from_index).is_occupied() is False:
-                    # add the space to the valid moves list.
-                    valid_moves.append((adjacent_row_up, column_move_from_index))
-                    adjacent_row_up -= 1
-                else:
-                    # if the space has a piece that is the same color as the piece moving.
-                    if self._game_board.get_board_point(adjacent_row_up, column_move_from_index).get_piece_on_point().\
-                            get_game_piece_color() == move_from_game_piece.get_game_piece_color():
+                    if code & enemy:
+                        valid_moves.append(to_square)
+                    break
+
+        elif piece_type == CANNON:
+            for ray in ORTHOGONAL_RAYS[from_square]:
+                # the same walk along the line goes on past the screen, the first piece, to the piece after it.
+                points = iter(ray)
+                for to_square in points:
+                    if squares[to_square] != EMPTY:
                         break
-                    else:
-                        # add the space to the valid moves list.
-                        valid_moves.append((adjacent_row_up, column_move_from_index))
+                    valid_moves.append(to_square)
+                # jump the screen and capture the next piece if it is an enemy.
+                for to_square in points:
+                    code = squares[to_square]
+                    if code != EMPTY:
+                        if code & enemy:
+                            valid_moves.append(to_square)
                         break
 
-            # all possible moves down
-            adjacent_row_down = row_move_from_index + 1
-            while adjacent_row_down <= 9:
-                # if the space is not occupied.
-                if self._game_board.get_board_point(adjacent_row_down, column_move_from_index).is_occupied() is False:
-                    # add the space to the valid moves list.
-                    valid_moves.append((adjacent_row_down, column_move_from_index))
-                    adjacent_row_down += 1
-                else:
-                    # if the space has a piece that is the same color as the piece moving.
-                    if self._game_board.get_board_point(adjacent_row_down, column_move_from_index).\
-                            get_piece_on_point().get_game_piece_color() == move_from_game_piece.get_game_piece_color():
-                        break
-                    else:
-                        # add the space to the valid moves list.
-                        valid_moves.append((adjacent_row_down, column_move_from_index))
-                        break
+        elif piece_type == HORSE:
+            for to_square, leg_square in HORSE_MOVES[from_square]:
+                # the horse is blocked by a piece on its leg.
+                if squares[leg_square] == EMPTY and not squares[to_square] & friend:
+                    valid_moves.append(to_square)
 
-            # all possible moves left
-            adjacent_column_left = column_move_from_index - 1
-            while adjacent_column_left >= 0:
-                # if the space is not occupied.
-                if self._game_board.get_board_point(row_move_from_index, adjacent_column_left).is_occupied() is False:
-                    # add the space to the valid moves list.
-                    valid_moves.append((row_move_from_index, adjacent_column_left))
-                    adjacent_column_left -= 1
-                else:
-                    # if the space has a piece that is the same color as the piece moving.
-                    if self._game_board.get_board_point(row_move_from_index, adjacent_column_left).\
-                            get_piece_on_point().get_game_piece_color() == move_from_game_piece.get_game_piece_color():
-                        break
-                    else:
-                        # add the space to the valid moves list.
-                        valid_moves.append((row_move_from_index, adjacent_column_left))
-                        break
+        elif piece_type == ELEPHANT:
+            for to_square, eye_square in ELEPHANT_MOVES[friend][from_square]:
+                # the elephant is blocked by a piece on its eye.
+                if squares[eye_square] == EMPTY and not squares[to_square] & friend:
+                    valid_moves.append(to_square)
 
-            # all possible moves right
-            adjacent_column_right = column_move_from_index + 1
-            while adjacent_column_right <= 8:
-                # if the space is not occupied.
-                if self._game_board.get_board_point(row_move_from_index, adjacent_column_right).is_occupied() is False:
-                    # add the space to the valid moves list.
-                    valid_moves.append((row_move_from_index, adjacent_column_right))
-                    adjacent_column_right += 1
-                else:
-                    # if the space has a piece that is the same color as the piece moving.
-                    if self._game_board.get_board_point(row_move_from_index, adjacent_column_right).\
-                            get_piece_on_point().get_game_piece_color() == move_from_game_piece.get_game_piece_color():
-                        break
-                    else:
-                        # add the space to the valid moves list.
-                        valid_moves.append((row_move_from_index, adjacent_column_right))
-                        break
-
-            # test if the moves in the valid moves list will cause general seeing general.
-            valid_moves = self.will_general_see_general(row_move_from_index, column_move_from_index, valid_moves)
-
-            return valid_moves
-
-        # if the piece is a cannon piece.
-        if isinstance(move_from_game_piece, Cannon):
-
-            # use similar mechanics as chariot but if it hits a piece, keep looking until the next is an enemy or
-            # friend or end of board.
-
-            # all possible moves up
-            adjacent_row_up = row_move_from_index - 1
-            found_piece = 0
-            while adjacent_row_up >= 0 and found_piece < 2:
-                # if space is not occupied
-                if self._game_board.get_board_point(adjacent_row_up, column_move_from_index).is_occupied() is False:
-                    if found_piece < 1:
-                        # add the space to the valid moves list.
-                        valid_moves.append((adjacent_row_up, column_move_from_index))
-                        adjacent_row_up -= 1
-                    else:
-                        adjacent_row_up -= 1
-                else:
-                    # if the space is occupied
-                    found_piece += 1
-                    if found_piece == 2:
-                        # if the space is occupied by a friend.
-                        if self._game_board.get_board_point(adjacent_row_up, column_move_from_index). \
-                                get_piece_on_point().get_game_piece_color() == move_from_game_piece. \
-                                get_game_piece_color():
-                            break
-                        else:
-                            # if the next piece is an enemy, add that space to valid moves
-                            valid_moves.append((adjacent_row_up, column_move_from_index))
-                            break
-                    else:
-                        # keep looking at the spaces up
-                        adjacent_row_up -= 1
-
-            # all possible moves down
-            adjacent_row_down = row_move_from_index + 1
-            found_piece = 0
-            while adjacent_row_down <= 9 and found_piece < 2:
-                # if space is not occupied
-                if self._game_board.get_board_point(adjacent_row_down, column_move_from_index).is_occupied() is False:
-                    if found_piece < 1:
-                        # add the space to the valid moves list.
-                        valid_moves.append((adjacent_row_down, column_move_from_index))
-                        adjacent_row_down += 1
-                    else:
-                        adjacent_row_down += 1
-                else:
-                    # if the space is occupied.
-                    found_piece += 1
-                    if found_piece == 2:
-                        # if the space is occupied by a friend.
-                        if self._game_board.get_board_point(adjacent_row_down, column_move_from_index). \
-                                get_piece_on_point().get_game_piece_color() == move_from_game_piece. \
-                                get_game_piece_color():
-                            break
-                        else:
-                            # if the next piece is an enemy, add that space to valid moves
-                            valid_moves.append((adjacent_row_down, column_move_from_index))
-                            break
-                    else:
-                        # keep looking at the spaces down
-                        adjacent_row_down += 1
-
-            # all possible moves left
-            adjacent_column_left = column_move_from_index - 1
-            found_piece = 0
-            while adjacent_column_left >= 0 and found_piece < 2:
-                # if space is not occupied
-                if self._game_board.get_board_point(row_move_from_index, adjacent_column_left).is_occupied() is False:
-                    if found_piece < 1:
-                        # add the space to the valid moves list.
-                        valid_moves.append((row_move_from_index, adjacent_column_left))
-                        adjacent_column_left -= 1
-                    else:
-                        adjacent_column_left -= 1
-                else:
-                    found_piece += 1
-                    if found_piece == 2:
-                        # if the space is occupied by a friend.
-                        if self._game_board.get_board_point(row_move_from_index, adjacent_column_left). \
-                                get_piece_on_point().get_game_piece_color() == move_from_game_piece. \
-                                get_game_piece_color():
-                            break
-                        else:
-                            # if the next piece is an enemy, add that space to valid moves
-                            valid_moves.append((row_move_from_index, adjacent_column_left))
-                            break
-                    # keep looking at spaces left
-                    else:
-                        adjacent_column_left -= 1
-
-            # all possible moves right
-            adjacent_column_right = column_move_from_index + 1
-            found_piece = 0
-            while adjacent_column_right <= 8 and found_piece < 2:
-                # if space is not occupied.
-                if self._game_board.get_board_point(row_move_from_index, adjacent_column_right).is_occupied() is False:
-                    if found_piece < 1:
-                        # add the space to the valid moves list.
-                        valid_moves.append((row_move_from_index, adjacent_column_right))
-                        adjacent_column_right += 1
-                    else:
-                        adjacent_column_right += 1
-                # if the space is occupied.
-                else:
-                    found_piece += 1
-                    if found_piece == 2:
-                        # if the space is occupied by a friend.
-                        if self._game_board.get_board_point(row_move_from_index, adjacent_column_right). \
-                                get_piece_on_point().get_game_piece_color() == move_from_game_piece. \
-                                get_game_piece_color():
-                            break
-                        else:
-                            # if the next piece is an enemy, add that space to valid moves
-                            valid_moves.append((row_move_from_index, adjacent_column_right))
-                            break
-                    # keep looking at the spaces right
-                    else:
-                        adjacent_column_right += 1
-
-            # test if the moves in the valid moves list will cause general seeing general.
-            valid_moves = self.will_general_see_general(row_move_from_index, column_move_from_index, valid_moves)
-
-            return valid_moves
-
-        # if the piece is a soldier piece
-        if isinstance(move_from_game_piece, Soldier):
+        else:
+            # the general, advisor and soldier are never blocked, so they only need the destination checked.
+            if piece_type == GENERAL:
+                destinations = GENERAL_MOVES[friend][from_square]
+            elif piece_type == ADVISOR:
+                destinations = ADVISOR_MOVES[friend][from_square]
+            else:
+                destinations = SOLDIER_MOVES[friend][from_square]
+            for to_square in destinations:
+                # the destination can be empty or an enemy.
+                if not squares[to_square] & friend:
+                    valid_moves.append(to_square)
 
-            # if the piece that is moving is red
-            if move_from_game_piece.get_game_piece_color() == "red":
-
-                # valid move down
-                adjacent_row_down = row_move_from_index + 1
-                if adjacent_row_down in range(0, 10):
-                    # if the space is not occupied
-                    if self._game_board.get_board_point(adjacent_row_down, column_move_from_index). \
-                            is_occupied() is False:
-                        # add the space to the valid moves list.
-                        valid_moves.append((adjacent_row_down, column_move_from_index))
-                    # if the space is occupied
-                    else:
-                        # if the space is an enemy.
-                        if self._game_board.get_board_point(adjacent_row_down, column_move_from_index). \
-                                get_piece_on_point().get_game_piece_color() != move_from_game_piece. \
-                                get_game_piece_color():
-                            # add the space to the valid moves list.
-                            valid_moves.append((adjacent_row_down, column_move_from_index))
-
-                # after the piece crosses the river.
-                if row_move_from_index > 4:
-                    # valid move left
-                    adjacent_column_left = column_move_from_index - 1
-                    if adjacent_column_left in range(0, 9):
-                        # if the space is not occupied
-                        if self._game_board.get_board_point(row_move_from_index, adjacent_column_left). \
-                                is_occupied() is False:
-                            # add the space to the valid moves list.
-                            valid_moves.append((row_move_from_index, adjacent_column_left))
-                        # if the space is occupied
-                        else:
-                            # if the space is an enemy.
-                            if self._game_board.get_board_point(row_move_from_index, adjacent_column_left). \
-                                    get_piece_on_point().get_game_piece_color() != move_from_game_piece. \
-                                    get_game_piece_color():
-                                # add the space to the valid moves list.
-                                valid_moves.append((row_move_from_index, adjacent_column_left))
-
-                    # valid more right
-                    adjacent_column_right = column_move_from_index + 1
-                    if adjacent_column_right in range(0, 9):
-                        # if the space is not occupied
-                        if self._game_board.get_board_point(row_move_from_index, adjacent_column_right). \
-                                is_occupied() is False:
-                            # add the space to the valid moves list.
-                            valid_moves.append((row_move_from_index, adjacent_column_right))
-                        # if the space is occupied
-                        else:
-                            # if the space is an enemy.
-                            if self._game_board.get_board_point(row_move_from_index, adjacent_column_right). \
-                                    get_piece_on_point().get_game_piece_color() != move_from_game_piece. \
-                                    get_game_piece_color():
-                                # add the space to the valid moves list.
-                                valid_moves.append((row_move_from_index, adjacent_column_right))
-
-            # if the piece that is moving is black
-            if move_from_game_piece.get_game_piece_color() == "black":
-
-                # valid move up
-                adjacent_row_up = row_move_from_index - 1
-                if adjacent_row_up in range(0, 10):
-                    # if the space is not occupied
-                    if self._game_board.get_board_point(adjacent_row_up, column_move_from_index). \
-                            is_occupied() is False:
-                        # add the space to the valid moves list.
-                        valid_moves.append((adjacent_row_up, column_move_from_index))
-                    # if the space is occupied
-                    else:
-                        # if the space is an enemy.
-                        if self._game_board.get_board_point(adjacent_row_up, column_move_from_index). \
-                                get_piece_on_point().get_game_piece_color() != move_from_game_piece. \
-                                get_game_piece_color():
-                            # add the space to the valid moves list.
-                            valid_moves.append((adjacent_row_up, column_move_from_index))
-
-                # once the black piece crosses the river
-                if row_move_from_index < 5:
-
-                    # valid move left
-                    adjacent_column_left = column_move_from_index - 1
-                    if adjacent_column_left in range(0, 9):
-                        # if the space is not occupied
-                        if self._game_board.get_board_point(row_move_from_index, adjacent_column_left). \
-                                is_occupied() is False:
-                            # add the space to the valid moves list.
-                            valid_moves.append((row_move_from_index, adjacent_column_left))
-                        # if the space is occupied
-                        else:
-                            # if the space is an enemy.
-                            if self._game_board.get_board_point(row_move_from_index, adjacent_column_left). \
-                                    get_piece_on_point().get_game_piece_color() != move_from_game_piece. \
-                                    get_game_piece_color():
-                                # add the space to the valid moves list.
-                                valid_moves.append((row_move_from_index, adjacent_column_left))
-
-                    # valid more right
-                    adjacent_column_right = column_move_from_index + 1
-                    if adjacent_column_right in range(0, 9):
-                        # if the space is not occupied
-                        if self._game_board.get_board_point(row_move_from_index, adjacent_column_right). \
-                                is_occupied() is False:
-                            # add the space to the valid moves list.
-                            valid_moves.append((row_move_from_index, adjacent_column_right))
-                        # if the space is occupied
-                        else:
-                            # if the space is an enemy.
-                            if self._game_board.get_board_point(row_move_from_index, adjacent_column_right). \
-                                    get_piece_on_point().get_game_piece_color() != move_from_game_piece. \
-                                    get_game_piece_color():
-                                # add the space to the valid moves list.
-                                valid_moves.append((row_move_from_index, adjacent_column_right))
-
-            # test if the moves in the valid moves list will cause general seeing general.
-            valid_moves = self.will_general_see_general(row_move_from_index, column_move_from_index, valid_moves)
-
-            return valid_moves
+        return valid_moves
 
     def will_general_see_general(self, piece_current_row, piece_current_column, list_of_possible_moves):
-        """Takes a game piece's current row on the board, current column on the board, and a list of moves to test."""
-        red_gen_location = self._game_board.get_red_general_location()
-        black_gen_location = self._game_board.get_black_general_location()
-        piece_count = 0
-        # create a separate list so we can iterate and remove things from list_of_possible_moves if necessary.
-        valid_list = list(list_of_possible_moves)
-
-        if self._game_board.get_board_point(piece_current_row, piece_current_column).get_piece_on_point(). \
-                get_piece_type() != "general":
-            # if the generals are on the same column.
-            if red_gen_location[1] == black_gen_location[1]:
-                # if the piece is on the same column as the generals.
-                if piece_current_column == black_gen_location[1]:
-                    # look at all the spaces between the generals.
-                    for row in range(red_gen_location[0]+1, black_gen_location[0]):
-                        # count the number of pieces between the generals
-                        if self._game_board.get_board_point(row, black_gen_location[1]).is_occupied() is True:
-                            piece_count += 1
-                    if piece_count > 1:
-                        return list_of_possible_moves
-                    # if there is only one piece
-                    elif piece_count == 1:
-                        # find the coordinates that are not on the same row as the generals
-                        for coordinates in valid_list:
-                            if coordinates[1] != black_gen_location[1]:
-                                # remove that coordinate from the list of possible moves.
-                                list_of_possible_moves.remove(coordinates)
-                        return list_of_possible_moves
-
-        if self._game_board.get_board_point(piece_current_row, piece_current_column).get_piece_on_point().\
-                get_piece_type() == "general":
-            # if the piece doing the moving is red.
-            if self._game_board.get_board_point(piece_current_row, piece_current_column).get_piece_on_point().\
-                    get_game_piece_color() == "red":
-                # if the generals columns are different
-                if piece_current_column != black_gen_location[1]:
-                    # iterate from the black general to row 0.
-                    for row in range(black_gen_location[0] - 1, -1, -1):
-                        if self._game_board.get_board_point(row, black_gen_location[1]).is_occupied() is True:
-                            piece_count += 1
-                            # if there is one piece and it is at row in front of red general.
-                            if piece_count == 1 and row == piece_current_row + 1:
-                                for coordinates in valid_list:
-                                    if coordinates[0] == row and coordinates[1] == black_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-                                return list_of_possible_moves
-                            # if there is one piece and it is at the same row as the red general.
-                            elif piece_count == 1 and row == piece_current_row:
-                                for coordinates in valid_list:
-                                    if coordinates[0] >= row and coordinates[1] == black_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-                                return list_of_possible_moves
-                            elif piece_count == 1 and row < piece_current_row:
-                                for coordinates in valid_list:
-                                    if coordinates[1] == black_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-                                return list_of_possible_moves
-                            else:
-                                continue
-                        else:
-                            continue
-                    # if there are no other pieces
-                    if piece_count == 0:
-                        for coordinates in valid_list:
-                            if coordinates[1] == black_gen_location[1]:
-                                # remove those coordinate from the list of possible moves.
-                                list_of_possible_moves.remove(coordinates)
-
-                # if the generals are on the same column
-                elif piece_current_column == black_gen_location[1]:
-                    # look at the rows between the generals, starting from the black.
-                    for row in range(black_gen_location[0] - 1, red_gen_location[0], -1):
-                        # if the space is occupied.
-                        if self._game_board.get_board_point(row, red_gen_location[1]).is_occupied() is True:
-                            piece_count += 1
-                            # if the generals are on the same column if there is only one piece and it is in front
-                            # of the red general.
-                            if piece_count == 1 and row == piece_current_row + 1:
-                                for coordinates in valid_list:
-                                    if coordinates[0] <= row and coordinates[1] == black_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-                            else:
-                                continue
-                        else:
-                            continue
-            # if the piece moving is black
-            elif self._game_board.get_board_point(piece_current_row, piece_current_column).get_piece_on_point().\
-                    get_game_piece_color() == "black":
-                # if the generals columns are different.
-                if piece_current_column != red_gen_location[1]:
-                    # look at the rows from between the red gen to the end of the board.
-                    for row in range(red_gen_location[0]+1, 10):
-                        if self._game_board.get_board_point(row, red_gen_location[1]).is_occupied() is True:
-                            piece_count += 1
-                            # if there a piece and it is on the row above the black general.
-                            if piece_count == 1 and row == piece_current_row - 1:
-                                for coordinates in valid_list:
-                                    if coordinates[0] == row and coordinates[1] == red_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-                                return list_of_possible_moves
-                            # if there is a piece and it is on the same row as the general.
-                            elif piece_count == 1 and row == piece_current_row:
-                                for coordinates in valid_list:
-                                    if coordinates[0] <= row and coordinates[1] == red_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-                                return list_of_possible_moves
-                            # if there is a piece and it on the row below the black general.
-                            elif piece_count == 1 and row == piece_current_row + 1:
-                                for coordinates in valid_list:
-                                    if coordinates[1] == red_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-                                return list_of_possible_moves
-                            else:
-                                continue
-                        else:
-                            continue
-                    # if there are no other pieces.
-                    if piece_count == 0:
-                        for coordinates in valid_list:
-                            if coordinates[1] == red_gen_location[1]:
-                                # remove those coordinate from the list of possible moves.
-                                list_of_possible_moves.remove(coordinates)
-                # if the generals are on the same column.
-                elif piece_current_column == red_gen_location[1]:
-                    for row in range(red_gen_location[0]+1, black_gen_location[0]):
-                        if self._game_board.get_board_point(row, red_gen_location[1]).is_occupied() is True:
-                            piece_count += 1
-                            # if the generals are on the same column if there is only one piece and it is in front
-                            # of the black general.
-                            if piece_count == 1 and piece_current_row == row + 1:
-                                for coordinates in valid_list:
-                                    if coordinates[0] <= row and coordinates[1] == red_gen_location[1]:
-                                        # remove those coordinate from the list of possible moves.
-                                        list_of_possible_moves.remove(coordinates)
-
-        return list_of_possible_moves
+        """Takes a game piece's current row on the board, current column on the board, and a list of moves to test.
+        Returns a list of the moves that do not leave the two generals facing each other on the same column with no
+        pieces between them."""
+        from_square = square_index(piece_current_row, piece_current_column)
+        return [coordinates for coordinates in list_of_possible_moves
+                if not self.generals_face_after_move(from_square, square_index(coordinates[0], coordinates[1]))]
+
+    def generals_face_after_move(self, from_square, to_square):
+        """Takes the index the piece moves from and the index it moves to and returns True if the generals would be
+        facing each other on the same column with no pieces between them after the move, otherwise returns False."""
+        squares = self._game_board.get_squares()
+        red_general = self._game_board.get_general_square(RED)
+        black_general = self._game_board.get_general_square(BLACK)
+        # a general that is captured can't see anything.
+        if red_general is None or black_general is None or to_square in (red_general, black_general):
+            return False
+        # the moving general's square changes.
+        if red_general == from_square:
+            red_general = to_square
+        elif black_general == from_square:
+            black_general = to_square
+        # the generals must be on the same column.
+        if (red_general - black_general) % BOARD_WIDTH != 0:
+            return False
+        # look at all the points between the generals, as they will be after the move.
+        for square in range(red_general + DOWN, black_general, DOWN):
+            if square == to_square or (squares[square] != EMPTY and square != from_square):
+                return False
+        return True
 
     def test_move_in_check(self, test_piece_row, test_piece_column, list_of_moves):
         """Takes the piece's current row, current column, and a list of moves and performs the move then checks if their
          own teams general will be in check after doing the move, if it is then remove that move from the list of valid
          moves and returns the list."""
-        # create a new list identical to the list of moves so we can iterate through the list and remove coordinates
-        # from the list of moves if necessary.
-        valid_moves = list(list_of_moves)
-        move_from_game_piece = self._game_board.get_board_point(test_piece_row, test_piece_column). \
-            get_piece_on_point()
-
-        if move_from_game_piece.get_game_piece_color() == "black":
-            for coordinates in valid_moves:
-                # if the coordinates is already occupied.
-                save_piece = self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point()
-                save_occupy_status = self._game_board.get_board_point(coordinates[0], coordinates[1]).is_occupied()
-                # move game piece to new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).\
-                    set_piece_on_point(move_from_game_piece)
-                # update the game piece location to the new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point().\
-                    set_location(coordinates[0], coordinates[1])
-                # change occupy status of new position.
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(True)
-                # remove game piece from old position
-                self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                    remove_piece_on_point(test_piece_row, test_piece_column)
-                # change occupy status for old position to False
-                self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(False)
-
-                black_general_location = self._game_board.get_black_general_location()
-                black_general_in_check = False
-                # look at all the valid moves of the red pieces
-                for row in range(0, 10):
-                    for column in range(0, 9):
-                        if self._game_board.get_board_point(row, column).is_occupied() is True:
-                            if self._game_board.get_board_point(row, column).get_piece_on_point(). \
-                                    get_game_piece_color() == "red":
-                                # if the black general's location is in any of those valid moves.
-                                if black_general_location in self.get_valid_moves(row, column):
-                                    black_general_in_check = True
-                                else:
-                                    continue
-                            else:
-                                continue
-                        else:
-                            continue
-
-                if black_general_in_check is True:
-                    # reverse the move
-                    # move game piece back to old position
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                        set_piece_on_point(self._game_board.get_board_point(coordinates[0], coordinates[1]).
-                                           get_piece_on_point())
-                    # update the game piece location.
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).get_piece_on_point().\
-                        set_location(test_piece_row, test_piece_column)
-                    # change the occupy status
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(True)
-                    # remove the game piece from "new" location and set back to what it was
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_piece_on_point(save_piece)
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(save_occupy_status)
-
-                    # remove the coordinates from the list of moves.
-                    list_of_moves.remove(coordinates)
-                else:
-                    # reverse the move
-                    # move game piece back to old position
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                        set_piece_on_point(self._game_board.get_board_point(coordinates[0], coordinates[1]).
-                                           get_piece_on_point())
-                    # update the game piece location.
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).get_piece_on_point().\
-                        set_location(test_piece_row, test_piece_column)
-                    # change the occupy status
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(True)
-                    # remove the game piece from "new" location and set back to what it was
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_piece_on_point(save_piece)
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(save_occupy_status)
+        from_square = square_index(test_piece_row, test_piece_column)
+        move_from_game_piece_color = self._game_board.get_squares()[from_square] & COLOR_MASK
+        # if color is not red or black
+        if move_from_game_piece_color == EMPTY:
             return list_of_moves
 
-        if move_from_game_piece.get_game_piece_color() == "red":
-            for coordinates in valid_moves:
-                # if the coordinates is already occupied.
-                save_piece = self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point()
-                save_occupy_status = self._game_board.get_board_point(coordinates[0], coordinates[1]).is_occupied()
-                # move game piece to new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).\
-                    set_piece_on_point(move_from_game_piece)
-                # update the game piece location to the new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point().\
-                    set_location(coordinates[0], coordinates[1])
-                # change occupy status of new position.
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(True)
-                # remove game piece from old position
-                self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                    remove_piece_on_point(test_piece_row, test_piece_column)
-                # change occupy status for old position to False
-                self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(False)
-
-                red_general_location = self._game_board.get_red_general_location()
-                red_general_in_check = False
-                # look at all the valid moves of the red pieces
-                for row in range(0, 10):
-                    for column in range(0, 9):
-                        if self._game_board.get_board_point(row, column).is_occupied() is True:
-                            if self._game_board.get_board_point(row, column).get_piece_on_point(). \
-                                    get_game_piece_color() == "black":
-                                # if the black general's location is in any of those valid moves.
-                                if red_general_location in self.get_valid_moves(row, column):
-                                    red_general_in_check = True
-                                else:
-                                    continue
-                            else:
-                                continue
-                        else:
-                            continue
-
-                if red_general_in_check is True:
-                    # reverse the move
-                    # move game piece back to old position
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                        set_piece_on_point(self._game_board.get_board_point(coordinates[0], coordinates[1]).
-                                           get_piece_on_point())
-                    # update the game piece location.
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).get_piece_on_point().\
-                        set_location(test_piece_row, test_piece_column)
-                    # change the occupy status
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(True)
-                    # remove the game piece from old location and set back to what it was
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_piece_on_point(save_piece)
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(save_occupy_status)
-
-                    # remove the coordinates from the list of moves.
-                    list_of_moves.remove(coordinates)
-                else:
-                    # reverse the move
-                    # move game piece back to old position
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                        set_piece_on_point(self._game_board.get_board_point(coordinates[0], coordinates[1]).
-                                           get_piece_on_point())
-                    # update the game piece location.
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).get_piece_on_point().\
-                        set_location(test_piece_row, test_piece_column)
-                    # change the occupy status
-                    self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(True)
-                    # remove the game piece from old location and set back to what it was
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_piece_on_point(save_piece)
-                    self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(save_occupy_status)
-            return list_of_moves
-        # if color is not red or black
+        # create a new list identical to the list of moves so we can iterate through the list and remove coordinates
+        # from the list of moves if necessary.
+        for coordinates in list(list_of_moves):
+            # do the move, check their own general and take the move back.
+            self.push(encode_move(from_square, square_index(coordinates[0], coordinates[1])))
+            general_in_check = self.is_in_check(COLOR_NAMES[move_from_game_piece_color])
+            self.pop()
+            if general_in_check is True:
+                # remove the coordinates from the list of moves.
+                list_of_moves.remove(coordinates)
         return list_of_moves
 
     def is_in_check(self, color):
         """Takes a color: either "red" or "black" and returns True if that color's general is in check. Otherwise,
         returns False."""
-
-        if color.lower() == "red":
-            red_general_location = self._game_board.get_red_general_location()
-            # look at all the valid moves of the black pieces
-            for row in range(0, 10):
-                for column in range(0, 9):
-                    if self._game_board.get_board_point(row, column).is_occupied() is True:
-                        if self._game_board.get_board_point(row, column).get_piece_on_point().\
-                                get_game_piece_color() == "black":
-                            # if the coordinates of the red general is in one of the moves.
-                            if red_general_location in self.get_valid_moves(row, column):
-                                return True
+        if color.lower() not in COLOR_CODES:
+            return None
+        color_code = COLOR_CODES[color.lower()]
+        general_square = self._game_board.get_general_square(color_code)
+        # a general that is not on the board can't be in check.
+        if general_square is None:
             return False
+        if self._position_cache is None:
+            # the general is in check if any piece of the other color attacks its square.
+            return self.is_square_attacked(general_square, color_code ^ COLOR_MASK)
+
+        position_hash = self.position_hash()
+        in_check = self._position_cache.get_value(position_hash, ("in_check", color_code))
+        if in_check is None:
+            in_check = self.is_square_attacked(general_square, color_code ^ COLOR_MASK)
+            self._position_cache.set_value(position_hash, ("in_check", color_code), in_check)
+        return in_check
+
+    def is_square_attacked(self, square, by_color):
+        """Takes an index on the board's array and a color code, RED or BLACK, and returns True if a piece of that
+        color could capture on the square, otherwise returns False. Looks outward from the square along the chariot
+        and cannon lines and at the points a horse, soldier, advisor, elephant or general could attack it from,
+        instead of generating the other color's moves."""
+        squares = self._game_board.get_squares()
+
+        # the first piece along a line attacks the square if it is a chariot, and the piece after that screen
+        # attacks the square if it is a cannon.
+        chariot = by_color | CHARIOT
+        cannon = by_color | CANNON
+        for step in ORTHOGONAL_STEPS:
+            attacker_square = square + step
+            while squares[attacker_square] == EMPTY:
+                attacker_square += step
+            if squares[attacker_square] == chariot:
+                return True
+            if squares[attacker_square] == OFF_BOARD:
+                continue
+            attacker_square += step
+            while squares[attacker_square] == EMPTY:
+                attacker_square += step
+            if squares[attacker_square] == cannon:
+                return True
 
-        if color.lower() == "black":
-            black_general_location = self._game_board.get_black_general_location()
-            # look at all the valid moves of the red pieces
-            for row in range(0, 10):
-                for column in range(0, 9):
-                    if self._game_board.get_board_point(row, column).is_occupied() is True:
-                        if self._game_board.get_board_point(row, column).get_piece_on_point().\
-                                get_game_piece_color() == "red":
-                            # if the black general's location is in any of those valid moves.
-                            if black_general_location in self.get_valid_moves(row, column):
-                                return True
-            return False
+        # a horse attacks the square if its leg is empty.
+        horse = by_color | HORSE
+        for attacker_square, leg_square in HORSE_ATTACKS[square]:
+            if squares[attacker_square] == horse and squares[leg_square] == EMPTY:
+                return True
+
+        soldier = by_color | SOLDIER
+        for attacker_square in SOLDIER_ATTACKS[by_color][square]:
+            if squares[attacker_square] == soldier:
+                return True
+
+        # the advisor, elephant and general can only attack squares in their own palace or half of the board.
+        advisor = by_color | ADVISOR
+        for attacker_square in ADVISOR_ATTACKS[by_color][square]:
+            if squares[attacker_square] == advisor:
+                return True
+        elephant = by_color | ELEPHANT
+        for attacker_square, eye_square in ELEPHANT_ATTACKS[by_color][square]:
+            if squares[attacker_square] == elephant and squares[eye_square] == EMPTY:
+                return True
+        general = by_color | GENERAL
+        for attacker_square in GENERAL_ATTACKS[by_color][square]:
+            if squares[attacker_square] == general:
+                return True
+
+        return False
 
     def test_move_game_won(self, test_piece_row, test_piece_column, list_of_moves):
         """Takes a piece's current row, current column, and their list of moves. Tests to see if the their team's
         general will be in check after the moves. Returns false if one of the moves makes the general not in check,
         otherwise, returns True."""
-        # create a new list identical to the list of moves so we can iterate through the list.
-        valid_moves = list(list_of_moves)
-        move_from_game_piece = self._game_board.get_board_point(test_piece_row, test_piece_column). \
-            get_piece_on_point()
-
-        if move_from_game_piece.get_game_piece_color() == "black":
-            black_general_in_check = True
-
-            for coordinates in valid_moves:
-                # if the coordinates is already occupied or not. change this !!!!
-                save_piece = self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point()
-                save_occupy_status = self._game_board.get_board_point(coordinates[0], coordinates[1]).is_occupied()
-                # move game piece to new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).\
-                    set_piece_on_point(move_from_game_piece)
-                # update the game piece location to the new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point().\
-                    set_location(coordinates[0], coordinates[1])
-                # change occupy status of new position.
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(True)
-                # remove game piece from old position
-                self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                    remove_piece_on_point(test_piece_row, test_piece_column)
-                # change occupy status for old position to False
-                self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(False)
-
-                # is black still in check after the move?
-                if self.is_in_check("black") is False:
-                    black_general_in_check = False
-
-                self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                    set_piece_on_point(self._game_board.get_board_point(coordinates[0], coordinates[1]).
-                                       get_piece_on_point())
-                # update the game piece location.
-                self._game_board.get_board_point(test_piece_row, test_piece_column).get_piece_on_point(). \
-                    set_location(test_piece_row, test_piece_column)
-                # change the occupy status
-                self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(True)
-                # remove the game piece from old location and set back to what it was
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_piece_on_point(save_piece)
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(save_occupy_status)
-                continue
-
-            return black_general_in_check
-
-        if move_from_game_piece.get_game_piece_color() == "red":
-            red_general_in_check = True
-            for coordinates in valid_moves:
-                # if the coordinates is already occupied.
-                save_piece = self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point()
-                save_occupy_status = self._game_board.get_board_point(coordinates[0], coordinates[1]).is_occupied()
-                # move game piece to new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).\
-                    set_piece_on_point(move_from_game_piece)
-                # update the game piece location to the new position
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).get_piece_on_point().\
-                    set_location(coordinates[0], coordinates[1])
-                # change occupy status of new position.
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(True)
-                # remove game piece from old position
-                self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                    remove_piece_on_point(test_piece_row, test_piece_column)
-                # change occupy status for old position to False
-                self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(False)
-                # is red is not in check after the move
-                if self.is_in_check("red") is False:
-                    red_general_in_check = False
-
-                # reverse the move
-                self._game_board.get_board_point(test_piece_row, test_piece_column).\
-                    set_piece_on_point(self._game_board.get_board_point(coordinates[0], coordinates[1]).
-                                       get_piece_on_point())
-                # update the game piece location.
-                self._game_board.get_board_point(test_piece_row, test_piece_column).get_piece_on_point(). \
-                    set_location(test_piece_row, test_piece_column)
-                # change the occupy status
-                self._game_board.get_board_point(test_piece_row, test_piece_column).set_occupied(True)
-                # remove the game piece from old location and set back to what it was
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_piece_on_point(save_piece)
-                self._game_board.get_board_point(coordinates[0], coordinates[1]).set_occupied(save_occupy_status)
-                continue
-
-            return red_general_in_check
-
-game = XiangqiGame()
-print(game.make_move("B1", "C3"))
-print(game.make_move("B8", "C8"))
-print(game.make_move("C3", "E2"))
-print(game.make_move("C8", "C4"))
-print(game.make_move("B3", "C3"))
-print(game.make_move("C4", "C1"))
-print(game.make_move("E1", "D2"))
-print(game.make_move("A10", "A9"))
-print(game.make_move("E4", "E5"))
-print(game.make_move("A9", "d9"))
-print(game.make_move("D2", "E3"))
-print(game.make_move("i10", "i9"))
-print(game.make_move("E2", "G3"))
-print(game.make_move("i9", "F9"))
-print(game.make_move("E3", "E2"))
-print(game.make_move("E7", "E6"))
-print(game.make_move("A4","A5"))
-print(game.make_move("D9", "D1"))
-print(game.make_move("A5","A6"))
-print(game.make_move("E6", "E5"))
-print(game.make_move("A6","A7"))
-print(game.make_move("E5", "E4"))
-print(game.make_move("A7","A8"))
-print(game.make_move("F9","F1"))
-print(game.make_move("A8","A9"))
-print(game.make_move("F1","G1"))
-print(game.make_move("A9","A10"))
-print(game.make_move("E10","D9"))
-print(game.make_move("A10","B10"))
-#print(game.make_move("E4","E3"))
-print(game.make_move("D1","F1"))
-print(game.make_move("A1","A10"))
-print(game.make_move("D9","E9"))
-print(game.make_move("A10","A1"))
-print(game.make_move("E9","F9"))
-print(game.make_move("A1","A10"))
-#print(game.make_move("G1","G2"))
-print(game.make_move("E4","E3"))
-print(game.make_move("E2","D2"))
-#print(game.make_move("G1","G2"))
-print(game.make_move("F9","E9"))
-print(game.make_move("A10","A1"))
-print(game.make_move("G1","G2"))
-print(game.make_move("G3","E2"))
-print(game.make_move("G2","E2"))
-game.display_game_board()
-print(game.is_in_check("black"))
-print(game.is_in_check("red"))
-print(game._game_board.get_red_general_location())
-print(game.get_game_state())
-print(game._players_turn)
\ No newline at end of file
+        from_square = square_index(test_piece_row, test_piece_column)
+        move_from_game_piece_color = self._game_board.get_squares()[from_square] & COLOR_MASK
+        if move_from_game_piece_color == EMPTY:
+            return None
+
+        for coordinates in list_of_moves:
+            # do the move, check their own general and take the move back.
+            self.push(encode_move(from_square, square_index(coordinates[0], coordinates[1])))
+            general_in_check = self.is_in_check(COLOR_NAMES[move_from_game_piece_color])
+            self.pop()
+            # is the general not in check after the move.
+            if general_in_check is False:
+                return False
+        return True
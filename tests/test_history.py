@@ -0,0 +1,58 @@
+# Date: 10/18/2026
+# Description: Tests the position history that XiangqiGame keeps for repetitions: taking back moves made before the
+#              history was started over, and the endings of a repeated position in make_move and replay.
+
+import unittest
+
+from xiangqi import ALGEBRAIC_SQUARES, XiangqiGame, encode_move
+from xiangqi.replay import replay
+
+# both horses go out and back twice, so the starting position comes up three times.
+HORSE_SHUFFLE = (("b1", "c3"), ("b10", "c8"), ("c3", "b1"), ("c8", "b10")) * 2
+
+
+class PositionHistoryTest(unittest.TestCase):
+    """Tests the position history and the repetition endings."""
+
+    def test_pop_past_cleared_history(self):
+        """Moves made before clear_position_history can be taken back, and the history starts over from each position
+        taken back to."""
+        game = XiangqiGame()
+        self.assertTrue(game.make_move("b1", "c3"))
+        self.assertTrue(game.make_move("b10", "c8"))
+        game.clear_position_history()
+        for _move_number in range(0, 2):
+            self.assertIsNot(game.pop(), False)
+            self.assertEqual(game.get_repetition_count(), 1)
+        self.assertIs(game.pop(), False)
+        self.assertEqual(game.get_repetition_count(), 1)
+
+    def test_repetition_is_a_draw(self):
+        """A position that comes up three times with no perpetual check ends the game in a draw."""
+        game = XiangqiGame()
+        for move_from, move_to in HORSE_SHUFFLE:
+            self.assertTrue(game.make_move(move_from, move_to))
+        self.assertEqual(game.get_repetition_count(), 3)
+        self.assertEqual(game.get_game_state(), "DRAW")
+        self.assertFalse(game.make_move("h1", "g3"))
+
+    def test_perpetual_check_loses(self):
+        """The player who gives check with every move of a repeated cycle loses."""
+        game = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/9/4A4/R3K4 w")
+        moves = (("a1", "a10"),) + (("e10", "e9"), ("a10", "a9"), ("e9", "e10"), ("a9", "a10")) * 2
+        for move_from, move_to in moves:
+            self.assertTrue(game.make_move(move_from, move_to))
+        self.assertEqual(game.get_game_state(), "BLACK_WON")
+
+    def test_replay_stops_at_repetition(self):
+        """replay treats a move after a repeated position as illegal and reports the draw."""
+        moves = [encode_move(ALGEBRAIC_SQUARES[move_from], ALGEBRAIC_SQUARES[move_to])
+                 for move_from, move_to in HORSE_SHUFFLE + (("h1", "g3"),)]
+        result = replay([moves])[0]
+        self.assertFalse(result.is_valid())
+        self.assertEqual(result.get_illegal_ply(), 8)
+        self.assertEqual(result.get_game_state(), "DRAW")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# Date: 10/18/2026
+# Description: Tests that importing the xiangqi package is quick and prints nothing, since worker processes import it
+#              every time they start. Run the tests with python -m unittest from the top of the repository.
+
+import subprocess
+import sys
+import unittest
+
+# the most time in seconds a new Python process may take to import the package, not counting starting Python.
+IMPORT_TIME_BUDGET = 0.25
+
+# imports the package in the new process with its output captured, then prints the seconds it took and the output.
+IMPORT_CODE = ("import sys, time, io\n"
+               "output = io.StringIO()\n"
+               "sys.stdout = output\n"
+               "start = time.perf_counter()\n"
+               "import xiangqi\n"
+               "seconds = time.perf_counter() - start\n"
+               "sys.stdout = sys.__stdout__\n"
+               "print(seconds)\n"
+               "print(output.getvalue(), end='')\n")
+
+
+class ImportTest(unittest.TestCase):
+    """Tests importing the package in a new Python process."""
+
+    def setUp(self):
+        """Imports the package in a new Python process and saves whether it worked, the seconds it took and whatever it
+        printed. The import is timed inside the new process so starting Python is not counted."""
+        result = subprocess.run([sys.executable, "-c", IMPORT_CODE], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        self.assertEqual(result.returncode, 0, "import xiangqi failed:\n" + result.stderr)
+        seconds, _, printed = result.stdout.partition("\n")
+        self._seconds = float(seconds)
+        self._printed = printed
+
+    def test_import_is_within_budget(self):
+        """Importing the package takes no more than IMPORT_TIME_BUDGET seconds."""
+        self.assertLessEqual(self._seconds, IMPORT_TIME_BUDGET)
+
+    def test_import_prints_nothing(self):
+        """Importing the package prints nothing."""
+        self.assertEqual(self._printed, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
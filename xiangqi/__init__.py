@@ -0,0 +1,12 @@
+# Date: 10/18/2026
+# Description: The xiangqi package. The game itself is in the XiangqiGame module, and the names used by the rest of the
+#              package are brought in here so they can be imported from xiangqi.
+
+from XiangqiGame import (
+    EMPTY, GENERAL, ADVISOR, ELEPHANT, HORSE, CHARIOT, CANNON, SOLDIER, RED, BLACK, TYPE_MASK, COLOR_MASK,
+    COLOR_CODES, COLOR_NAMES, BOARD_SQUARES, ALGEBRAIC_SQUARES, FEN_PIECE_LETTERS, FEN_PIECE_TYPES, START_FEN,
+    PACKED_BOARD_BYTES, PACKED_POSITION_BYTES, PIECE_VALUES, PIECE_SQUARE_VALUES, GENERAL_MOVES, ADVISOR_MOVES,
+    ELEPHANT_MOVES, HORSE_MOVES, SOLDIER_MOVES, ORTHOGONAL_RAYS, REPETITION_LIMIT,
+    square_index, square_row, square_column, square_name, encode_move, move_from_square, move_to_square,
+    Board, PositionCache, XiangqiGame,
+)
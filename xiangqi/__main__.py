@@ -0,0 +1,32 @@
+# Date: 10/18/2026
+# Description: The demo game that used to run when XiangqiGame was imported. Run it with python -m xiangqi.
+
+from xiangqi import XiangqiGame
+
+
+def main():
+    """Plays the demo game, printing the result of each move, the board and the game state at the end. Black's cannons
+    and horses go after the red general, which is checkmated when the black horse steps off the center column."""
+    game = XiangqiGame()
+    print(game.make_move("B3", "E3"))
+    print(game.make_move("H10", "G8"))
+    print(game.make_move("H3", "G3"))
+    print(game.make_move("B8", "E8"))
+    print(game.make_move("A1", "A3"))
+    print(game.make_move("E8", "E4"))
+    print(game.make_move("E3", "E7"))
+    print(game.make_move("G8", "E7"))
+    print(game.make_move("G3", "C3"))
+    print(game.make_move("H8", "E8"))
+    print(game.make_move("C3", "H3"))
+    print(game.make_move("E7", "G8"))
+    game.display_game_board()
+    print(game.is_in_check("black"))
+    print(game.is_in_check("red"))
+    print(game.get_game_board().get_red_general_location())
+    print(game.get_game_state())
+    print(game.get_players_turn())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Date: 10/18/2026
+# Description: Analyzes the games in archives on several processes. The games are split into shards of game numbers,
+#              each worker process opens the archive itself and replays its shard, and only small tuples of numbers,
+#              strings and packed positions are sent back. The results are put back in archive and game order, so
+#              they are the same for any number of workers.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from xiangqi import EMPTY, XiangqiGame
+from xiangqi.archive import ArchiveReader
+from xiangqi.replay import replay_game
+
+# the number of games each worker process is given at a time.
+GAMES_PER_SHARD = 256
+
+
+class GameAnalysis:
+    """Represents what was found by replaying one game of an archive."""
+
+    def __init__(self, path, game_number, moves_played, illegal_ply, game_state, captures, checks, position):
+        """Takes the path of the archive, the number of the game in it, the number of moves played, the index of the
+        first illegal move or None, the game state after the moves played, a dictionary of the captures made by each
+        color, a dictionary of the checks given by each color, and the position after the moves made by
+        XiangqiGame.to_bytes. Initializes private data members for each of them."""
+        self._path = path
+        self._game_number = game_number
+        self._moves_played = moves_played
+        self._illegal_ply = illegal_ply
+        self._game_state = game_state
+        self._captures = captures
+        self._checks = checks
+        self._position = position
+
+    def __repr__(self):
+        """Returns unambiguous representation of all the data in the object."""
+        return "GameAnalysis(" + repr(self._path) + ", " + str(self._game_number) + ", " + str(self._moves_played) + \
+               ", " + str(self._illegal_ply) + ", " + str(self._game_state) + ", " + str(self._captures) + ", " + \
+               str(self._checks) + ", " + repr(self._position) + ")"
+
+    def get_path(self):
+        """Returns the path of the archive the game is in."""
+        return self._path
+
+    def get_game_number(self):
+        """Returns the number of the game in its archive."""
+        return self._game_number
+
+    def get_moves_played(self):
+        """Returns the number of moves that were played before the end of the game or the first illegal move."""
+        return self._moves_played
+
+    def get_illegal_ply(self):
+        """Returns the index in the game's moves of the first illegal move, or None if every move was legal."""
+        return self._illegal_ply
+
+    def is_valid(self):
+        """Returns True if every move in the game was legal, otherwise returns False."""
+        return self._illegal_ply is None
+
+    def get_game_state(self):
+        """Returns the game state after the moves played: "UNFINISHED", "RED_WON", "BLACK_WON" or "DRAW"."""
+        return self._game_state
+
+    def get_captures(self, color):
+        """Takes a color: either "red" or "black" and returns the number of pieces that color captured."""
+        return self._captures[color]
+
+    def get_checks(self, color):
+        """Takes a color: either "red" or "black" and returns the number of checks that color gave."""
+        return self._checks[color]
+
+    def get_position(self):
+        """Returns the position after the moves played, made by XiangqiGame.to_bytes. It can be loaded with
+        XiangqiGame.from_bytes."""
+        return self._position
+
+
+def analyze_game(game, moves):
+    """Takes a XiangqiGame at the starting position and a sequence of moves encoded by encode_move. Replays the moves,
+    stopping at the first illegal move, and returns a tuple of the number of moves played, the index of the first
+    illegal move or None, the game state, the captures by each color, the checks by each color, and the position
+    made by XiangqiGame.to_bytes. The moves are taken back before returning so the game can be used again."""
+    captures = {"red": 0, "black": 0}
+    checks = {"red": 0, "black": 0}
+
+    def count_move(game, move, captured):
+        """Takes the game after a move, the move and the piece it captured, and counts the capture and the check."""
+        # the player whose turn it is now is the one the move was made against.
+        opponent = game.get_players_turn()
+        color = "black" if opponent == "red" else "red"
+        if captured != EMPTY:
+            captures[color] += 1
+        if game.is_in_check(opponent):
+            checks[color] += 1
+
+    result = replay_game(game, moves, True, count_move)
+    return (result.get_moves_played(), result.get_illegal_ply(), result.get_game_state(), captures, checks,
+            result.get_position())
+
+
+def _analyze_shard(path, first_game_number, last_game_number):
+    """Takes the path of an archive and a range of game numbers, from the first up to but not including the last, and
+    returns a list with the result of analyze_game for each of those games. Runs in a worker process, which opens the
+    archive itself so no games have to be sent to it."""
+    game = XiangqiGame()
+    with ArchiveReader(path) as archive:
+        return [analyze_game(game, archive.get_moves(game_number))
+                for game_number in range(first_game_number, last_game_number)]
+
+
+def analyze_games(paths, workers=None, games_per_shard=GAMES_PER_SHARD):
+    """Takes a list of paths of archives written by ArchiveWriter, an optional number of worker processes and an
+    optional number of games to give a worker at a time. Returns a list with a GameAnalysis for every game, in the
+    order of the paths and then of the games in each archive. Uses as many workers as there are CPUs if workers is
+    not given, and analyzes the games in this process if workers is 1."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # split every archive into shards of game numbers.
+    shards = []
+    for path in paths:
+        with ArchiveReader(path) as archive:
+            game_count = archive.get_game_count()
+        for first_game_number in range(0, game_count, games_per_shard):
+            shards.append((path, first_game_number, min(first_game_number + games_per_shard, game_count)))
+
+    shard_paths = [shard[0] for shard in shards]
+    shard_firsts = [shard[1] for shard in shards]
+    shard_lasts = [shard[2] for shard in shards]
+    if workers == 1:
+        shard_results = map(_analyze_shard, shard_paths, shard_firsts, shard_lasts)
+        return _merge_results(shards, shard_results)
+    # map hands back the results in the order of the shards, whichever worker finishes first.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shard_results = executor.map(_analyze_shard, shard_paths, shard_firsts, shard_lasts)
+        return _merge_results(shards, shard_results)
+
+
+def _merge_results(shards, shard_results):
+    """Takes the list of shards and an iterable of their results in the same order and returns the list of
+    GameAnalysis objects for all of the games."""
+    analyses = []
+    for (path, first_game_number, last_game_number), results in zip(shards, shard_results):
+        for game_number, result in zip(range(first_game_number, last_game_number), results):
+            analyses.append(GameAnalysis(path, game_number, *result))
+    return analyses
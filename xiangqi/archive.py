@@ -0,0 +1,163 @@
+# Date: 10/18/2026
+# Description: A binary archive of games. Each move is stored in two bytes as the integer made by encode_move, and an
+#              index at the end of the file holds where each game's moves start, how many moves it has and how it
+#              ended. ArchiveWriter writes an archive one game at a time, and ArchiveReader memory-maps an archive so
+#              any game can be read directly and all the games can be streamed without loading the whole file.
+
+import mmap
+import struct
+import sys
+from array import array
+
+from xiangqi import ALGEBRAIC_SQUARES, encode_move
+
+# the header is the magic bytes, the format version, unused flags, the number of games and where the index starts.
+ARCHIVE_MAGIC = b"XQAR"
+ARCHIVE_VERSION = 1
+HEADER_FORMAT = struct.Struct("<4sHHQQ")
+# each index entry is where the game's moves start, the number of moves and the game state code, padded to 16 bytes.
+INDEX_ENTRY_FORMAT = struct.Struct("<QIB3x")
+# each move is a little-endian unsigned 16-bit integer.
+MOVE_BYTES = 2
+
+GAME_STATE_CODES = {"UNFINISHED": 0, "RED_WON": 1, "BLACK_WON": 2, "DRAW": 3}
+GAME_STATE_NAMES = {code: name for name, code in GAME_STATE_CODES.items()}
+
+
+def encode_algebraic_moves(algebraic_moves):
+    """Takes a list of (move from, move to) pairs in algebraic notation, such as ("B1", "C3"), and returns a list of
+    the moves encoded by encode_move. Returns None if a point is not on the board. The moves are not checked to be
+    legal."""
+    moves = []
+    for move_from, move_to in algebraic_moves:
+        from_square = ALGEBRAIC_SQUARES.get(move_from.lower())
+        to_square = ALGEBRAIC_SQUARES.get(move_to.lower())
+        if from_square is None or to_square is None:
+            return None
+        moves.append(encode_move(from_square, to_square))
+    return moves
+
+
+class ArchiveWriter:
+    """Represents an archive file being written. Games are added with add_game and the index is written by close."""
+
+    def __init__(self, path):
+        """Takes the path of the archive to write, replacing any file there. Initializes private data members: the open
+        file and the index entries of the games added so far. A header is written now and filled in by close."""
+        self._file = open(path, "wb")
+        self._index = []
+        self._file.write(HEADER_FORMAT.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0, 0, 0))
+
+    def __enter__(self):
+        """Returns the archive so it can be used in a with statement."""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the archive at the end of a with statement."""
+        self.close()
+
+    def add_game(self, moves, game_state="UNFINISHED"):
+        """Takes a list of moves encoded by encode_move, all starting from the starting position, and the game state at
+        the end of the game, and adds the game to the archive. Returns the number of the game in the archive, or False
+        if the game state is not known."""
+        if game_state not in GAME_STATE_CODES:
+            return False
+        move_array = array("H", moves)
+        # the archive is little-endian.
+        if sys.byteorder != "little":
+            move_array.byteswap()
+        self._index.append((self._file.tell(), len(move_array), GAME_STATE_CODES[game_state]))
+        self._file.write(move_array.tobytes())
+        return len(self._index) - 1
+
+    def get_game_count(self):
+        """Returns the number of games added so far."""
+        return len(self._index)
+
+    def close(self):
+        """Writes the index and the finished header and closes the file. Does nothing if it is already closed."""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(INDEX_ENTRY_FORMAT.pack(*entry))
+        self._file.seek(0)
+        self._file.write(HEADER_FORMAT.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0, len(self._index), index_offset))
+        self._file.close()
+
+
+class ArchiveReader:
+    """Represents an archive file opened for reading. The file is memory-mapped, so only the games that are read are
+    loaded from disk."""
+
+    def __init__(self, path):
+        """Takes the path of an archive written by ArchiveWriter. Initializes private data members: the open file, the
+        memory map of it, the number of games and where the index starts. Raises ValueError if the file is not an
+        archive of a known version."""
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER_FORMAT.size:
+            self.close()
+            raise ValueError("not a game archive: " + str(path))
+        magic, version, flags, game_count, index_offset = HEADER_FORMAT.unpack_from(self._map, 0)
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            self.close()
+            raise ValueError("not a game archive of version " + str(ARCHIVE_VERSION) + ": " + str(path))
+        self._game_count = game_count
+        self._index_offset = index_offset
+
+    def __enter__(self):
+        """Returns the archive so it can be used in a with statement."""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the archive at the end of a with statement."""
+        self.close()
+
+    def __len__(self):
+        """Returns the number of games in the archive."""
+        return self._game_count
+
+    def __iter__(self):
+        """Yields the moves of each game in order, reading one game at a time."""
+        for game_number in range(0, self._game_count):
+            yield self.get_moves(game_number)
+
+    def get_game_count(self):
+        """Returns the number of games in the archive."""
+        return self._game_count
+
+    def get_index_entry(self, game_number):
+        """Takes the number of a game and returns a tuple of where its moves start in the file, the number of moves,
+        and the game state code. Returns None if there is no game with that number."""
+        if not 0 <= game_number < self._game_count:
+            return None
+        return INDEX_ENTRY_FORMAT.unpack_from(self._map, self._index_offset + game_number * INDEX_ENTRY_FORMAT.size)
+
+    def get_moves(self, game_number):
+        """Takes the number of a game and returns its moves as an array of integers encoded by encode_move. Returns None
+        if there is no game with that number."""
+        entry = self.get_index_entry(game_number)
+        if entry is None:
+            return None
+        offset, move_count, game_state_code = entry
+        move_array = array("H")
+        move_array.frombytes(self._map[offset:offset + move_count * MOVE_BYTES])
+        if sys.byteorder != "little":
+            move_array.byteswap()
+        return move_array
+
+    def get_game_state(self, game_number):
+        """Takes the number of a game and returns the game state it ended in: "UNFINISHED", "RED_WON", "BLACK_WON" or
+        "DRAW". Returns None if there is no game with that number."""
+        entry = self.get_index_entry(game_number)
+        if entry is None:
+            return None
+        return GAME_STATE_NAMES[entry[2]]
+
+    def close(self):
+        """Closes the memory map and the file."""
+        if not self._map.closed:
+            self._map.close()
+        if not self._file.closed:
+            self._file.close()
@@ -0,0 +1,80 @@
+# Date: 10/18/2026
+# Description: A benchmark for the move generator. Runs perft from the starting position and from test positions,
+#              prints the node counts and the nodes per second, and compares the counts to known values. Run it with
+#              python -m xiangqi.bench. It exits with status 1 if any count is wrong.
+
+import argparse
+import sys
+import time
+
+from xiangqi import XiangqiGame
+
+# the known perft counts from the starting position, for depths 1, 2, 3 and so on.
+START_POSITION_COUNTS = (44, 1920, 79666, 3290240, 133312995)
+
+# test positions in FEN and their known perft counts for depths 1, 2, 3 and so on.
+TEST_POSITIONS = (
+    ("r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 w", (38, 1128, 43929, 1339047)),
+    ("1cbak4/9/n2a5/2p1p3p/5cp2/2n2N3/6PCP/3AB4/2C6/3A1K1N1 w", (7, 281, 8620, 326201)),
+    ("5a3/3k5/3aR4/9/5r3/5n3/9/3A1A3/5K3/2BC2B2 w", (25, 424, 9850, 202884)),
+    ("CRN1k1b2/3ca4/4ba3/9/2nr5/9/9/4B4/4A4/4KA3 w", (28, 516, 14808, 395483)),
+    ("R1N1k1b2/9/3aba3/9/2nr5/2B6/9/4B4/4A4/4KA3 w", (21, 364, 7626, 162837)),
+    ("C1nNk4/9/9/9/9/9/n1pp5/B3C4/9/3A1K3 w", (28, 222, 6241)),
+    ("4ka3/4a4/9/9/4N4/p8/9/4C3c/7n1/2BK5 w", (23, 345, 8124, 149272)),
+    ("2b1ka3/9/b3N4/4n4/9/9/9/4C4/2p6/2BK5 w", (21, 195, 3883, 48060)),
+)
+
+
+def run_perft(game, name, counts, depth):
+    """Takes a game, a name for the position, the known counts and the deepest depth to search. Runs perft at each depth
+    there is a known count for, prints the results, and returns a tuple of True if all the counts are right and the
+    number of nodes perft counted at all depths."""
+    all_correct = True
+    total_nodes = 0
+    for current_depth in range(1, min(depth, len(counts)) + 1):
+        start = time.perf_counter()
+        nodes = game.perft(current_depth)
+        seconds = time.perf_counter() - start
+        expected = counts[current_depth - 1]
+        status = "OK" if nodes == expected else "FAIL (expected %d)" % expected
+        nodes_per_second = nodes / seconds if seconds > 0 else 0.0
+        print("%-64s depth %d %12d nodes %9.3f s %10.0f nodes/s  %s"
+              % (name, current_depth, nodes, seconds, nodes_per_second, status))
+        if nodes != expected:
+            all_correct = False
+        total_nodes += nodes
+    return all_correct, total_nodes
+
+
+def main(argv=None):
+    """Takes the command line arguments, runs the benchmark and returns the exit status: 0 if every count is right and
+    1 if any count is wrong."""
+    parser = argparse.ArgumentParser(description="Runs perft on test positions and reports the nodes per second.")
+    parser.add_argument("--depth", type=int, default=3, help="the deepest perft depth for the starting position")
+    parser.add_argument("--fen-depth", type=int, default=None,
+                        help="the deepest perft depth for the test positions, the same as --depth if not given")
+    arguments = parser.parse_args(argv)
+    fen_depth = arguments.fen_depth if arguments.fen_depth is not None else arguments.depth
+
+    all_correct = True
+    total_nodes = 0
+    start = time.perf_counter()
+
+    positions = [(XiangqiGame(), "start position", START_POSITION_COUNTS, arguments.depth)]
+    positions += [(XiangqiGame.from_fen(fen), fen, counts, fen_depth) for fen, counts in TEST_POSITIONS]
+    for game, name, counts, depth in positions:
+        is_correct, nodes = run_perft(game, name, counts, depth)
+        if not is_correct:
+            all_correct = False
+        total_nodes += nodes
+
+    seconds = time.perf_counter() - start
+    print("total %d nodes in %.3f s, %.0f nodes/s" % (total_nodes, seconds, total_nodes / seconds if seconds else 0.0))
+    if not all_correct:
+        print("some counts were wrong")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
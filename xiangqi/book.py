@@ -0,0 +1,159 @@
+# Date: 10/18/2026
+# Description: An opening book. BookBuilder replays games from the starting position and counts how often each move
+#              was played from each position in the first plies, then writes a file of fixed-size records sorted by
+#              position hash. OpeningBook memory-maps the file and finds the moves for a position by binary search.
+
+import mmap
+import random
+import struct
+
+from xiangqi import REPETITION_LIMIT, XiangqiGame
+
+# the header is the magic bytes, the format version, unused flags and the number of records.
+BOOK_MAGIC = b"XQBK"
+BOOK_VERSION = 1
+HEADER_FORMAT = struct.Struct("<4sHHQ")
+# each record is the position hash from XiangqiGame.position_hash, the move encoded by encode_move and its weight.
+RECORD_FORMAT = struct.Struct("<QHH")
+HASH_FORMAT = struct.Struct("<Q")
+# the largest weight a record can hold.
+MAX_WEIGHT = 65535
+DEFAULT_MAX_PLIES = 20
+
+
+class BookBuilder:
+    """Represents an opening book being built from games."""
+
+    def __init__(self, max_plies=DEFAULT_MAX_PLIES):
+        """Takes an optional number of plies from the start of each game to put in the book. Initializes private data
+        members: max_plies, the weights found so far as a dictionary of (position hash, move) to the number of times
+        the move was played, and the game used to replay the moves."""
+        self._max_plies = max_plies
+        self._weights = {}
+        self._game = XiangqiGame()
+
+    def add_game(self, moves):
+        """Takes a sequence of moves encoded by encode_move from the starting position and adds the first max_plies of
+        them to the book. Stops at the first illegal move, or when a position comes up REPETITION_LIMIT times and the
+        game is over. Returns the number of moves added."""
+        game = self._game
+        weights = self._weights
+        moves_added = 0
+        for move in moves:
+            if moves_added >= self._max_plies or game.get_repetition_count() >= REPETITION_LIMIT:
+                break
+            if game.is_legal_move(move) is False:
+                break
+            key = (game.position_hash(), move)
+            weights[key] = weights.get(key, 0) + 1
+            game.push(move)
+            moves_added += 1
+        # take the moves back so the next game starts from the starting position.
+        game.pop_all()
+        return moves_added
+
+    def add_games(self, games):
+        """Takes an iterable of games, each a sequence of moves encoded by encode_move, such as an ArchiveReader, and
+        adds each of them to the book. Returns the number of games added."""
+        game_count = 0
+        for moves in games:
+            self.add_game(moves)
+            game_count += 1
+        return game_count
+
+    def get_record_count(self):
+        """Returns the number of (position, move) records in the book so far."""
+        return len(self._weights)
+
+    def write(self, path):
+        """Takes a path and writes the book there as a header followed by the records sorted by position hash and then
+        by move. Weights above MAX_WEIGHT are written as MAX_WEIGHT."""
+        with open(path, "wb") as book_file:
+            book_file.write(HEADER_FORMAT.pack(BOOK_MAGIC, BOOK_VERSION, 0, len(self._weights)))
+            for (position_hash, move), weight in sorted(self._weights.items()):
+                book_file.write(RECORD_FORMAT.pack(position_hash, move, min(weight, MAX_WEIGHT)))
+
+
+class OpeningBook:
+    """Represents an opening book file opened for reading. The file is memory-mapped and searched in place."""
+
+    def __init__(self, path):
+        """Takes the path of a book written by BookBuilder. Initializes private data members: the open file, the memory
+        map of it and the number of records. Raises ValueError if the file is not a book of a known version."""
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER_FORMAT.size:
+            self.close()
+            raise ValueError("not an opening book: " + str(path))
+        magic, version, flags, record_count = HEADER_FORMAT.unpack_from(self._map, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            self.close()
+            raise ValueError("not an opening book of version " + str(BOOK_VERSION) + ": " + str(path))
+        self._record_count = record_count
+
+    def __enter__(self):
+        """Returns the book so it can be used in a with statement."""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the book at the end of a with statement."""
+        self.close()
+
+    def __len__(self):
+        """Returns the number of records in the book."""
+        return self._record_count
+
+    def get_moves(self, position_hash):
+        """Takes a position hash from XiangqiGame.position_hash and returns a list of (move, weight) pairs for the moves
+        the book has for that position, most played first. Returns an empty list if the position is not in the
+        book."""
+        book_map = self._map
+        record_size = RECORD_FORMAT.size
+        header_size = HEADER_FORMAT.size
+        unpack_hash = HASH_FORMAT.unpack_from
+        unpack_record = RECORD_FORMAT.unpack_from
+
+        # binary search for the first record with this hash.
+        low = 0
+        high = self._record_count
+        while low < high:
+            middle = (low + high) // 2
+            if unpack_hash(book_map, header_size + middle * record_size)[0] < position_hash:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        for record_number in range(low, self._record_count):
+            record_hash, move, weight = unpack_record(book_map, header_size + record_number * record_size)
+            if record_hash != position_hash:
+                break
+            moves.append((move, weight))
+        moves.sort(key=lambda move_and_weight: -move_and_weight[1])
+        return moves
+
+    def choose_move(self, game, random_generator=None):
+        """Takes a XiangqiGame and an optional random.Random, and returns a book move for the player whose turn it is,
+        picked at random with the chance of each move in proportion to its weight. Only the chosen move is checked to
+        be legal. Returns None if the position is not in the book or the move is not legal."""
+        moves = self.get_moves(game.position_hash())
+        if not moves:
+            return None
+        if random_generator is None:
+            random_generator = random
+        pick = random_generator.randrange(0, sum(weight for move, weight in moves))
+        for move, weight in moves:
+            if pick < weight:
+                break
+            pick -= weight
+        # a different position with the same hash could be in the book, so the move is checked.
+        if game.is_legal_move(move) is False:
+            return None
+        return move
+
+    def close(self):
+        """Closes the memory map and the file."""
+        if not self._map.closed:
+            self._map.close()
+        if not self._file.closed:
+            self._file.close()
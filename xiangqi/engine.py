@@ -0,0 +1,364 @@
+# Date: 10/18/2026
+# Description: An engine that chooses a move for the player whose turn it is. It searches the legal moves of a
+#              XiangqiGame with iterative deepening alpha-beta search, one depth at a time until a time limit, a node
+#              limit or a maximum depth is reached, and returns the best move found with the line of play it expects.
+
+import time
+
+from xiangqi import EMPTY, GENERAL, ADVISOR, ELEPHANT, HORSE, CHARIOT, CANNON, SOLDIER, TYPE_MASK, PIECE_VALUES, \
+    square_name
+
+# the score of a checkmate or stalemate, less the number of moves it takes, so quicker wins score higher.
+MATE_SCORE = 100000
+INFINITE_SCORE = MATE_SCORE + 1
+# scores this close to MATE_SCORE are wins or losses found by the search.
+MATE_THRESHOLD = MATE_SCORE - 1000
+DEFAULT_MAX_DEPTH = 64
+# the most moves from the root the search can reach, counting the quiescence search.
+MAX_PLY = 128
+# a capture is not searched by the quiescence search if winning the captured piece and this much more would still not
+# raise the score to alpha.
+DELTA_MARGIN = 200
+# the number of nodes searched between checks of the time limit.
+NODES_BETWEEN_TIME_CHECKS = 1024
+
+# the rank of each piece type for ordering captures, most valuable victim first and then least valuable attacker.
+CAPTURE_ORDER_VALUES = {GENERAL: 7, CHARIOT: 6, CANNON: 5, HORSE: 4, ADVISOR: 3, ELEPHANT: 2, SOLDIER: 1}
+# the number of killer moves kept for each ply.
+KILLER_SLOTS = 2
+# moves are sorted by a single number: captures score above killer moves, which score above the history of quiet
+# moves. History scores are kept below KILLER_ORDER_SCORE by halving the table when one grows too large.
+CAPTURE_ORDER_SCORE = 1 << 30
+KILLER_ORDER_SCORE = 1 << 28
+HISTORY_SCORE_LIMIT = KILLER_ORDER_SCORE >> 1
+
+
+class SearchResult:
+    """Represents the result of a search: the best move, the line of play the engine expects after it, its score, the
+    depth of the last finished iteration, the number of nodes searched and the time it took."""
+
+    def __init__(self, principal_variation, score, depth, nodes, seconds):
+        """Takes the principal variation as a list of moves encoded by encode_move, the score for the player whose turn
+        it was, the depth, the number of nodes and the seconds. Initializes private data members for each of them."""
+        self._principal_variation = principal_variation
+        self._score = score
+        self._depth = depth
+        self._nodes = nodes
+        self._seconds = seconds
+
+    def __repr__(self):
+        """Returns unambiguous representation of all the data in the object."""
+        return "SearchResult(" + str(self._principal_variation) + ", " + str(self._score) + ", " + str(self._depth) + \
+               ", " + str(self._nodes) + ", " + str(self._seconds) + ")"
+
+    def get_best_move(self):
+        """Returns the best move encoded by encode_move, or None if there is no legal move."""
+        if not self._principal_variation:
+            return None
+        return self._principal_variation[0]
+
+    def get_principal_variation(self):
+        """Returns the list of moves, encoded by encode_move, that the engine expects to be played starting with the
+        best move."""
+        return list(self._principal_variation)
+
+    def get_principal_variation_notation(self):
+        """Returns the principal variation as a list of (move from, move to) pairs in algebraic notation, such as
+        ("B1", "C3"), that can be passed to make_move."""
+        return [(square_name(move >> 8).upper(), square_name(move & 255).upper())
+                for move in self._principal_variation]
+
+    def get_score(self):
+        """Returns the score of the best move for the player whose turn it was. A score above MATE_THRESHOLD is a win
+        found by the search and a score below -MATE_THRESHOLD is a loss."""
+        return self._score
+
+    def get_depth(self):
+        """Returns the depth of the last iteration the search finished."""
+        return self._depth
+
+    def get_nodes(self):
+        """Returns the number of positions searched."""
+        return self._nodes
+
+    def get_seconds(self):
+        """Returns the number of seconds the search took."""
+        return self._seconds
+
+
+class MoveOrderer:
+    """Represents the move ordering used by an Engine. Captures are searched first, the most valuable victim and then
+    the least valuable attacker first. Then come the killer moves: quiet moves that caused a cutoff at the same ply
+    elsewhere in the tree. The other quiet moves are ordered by a history table of how often and how deep each move
+    has caused a cutoff. A different orderer can be given to an Engine as long as it has the same methods."""
+
+    def __init__(self):
+        """Initializes private data members: the killer moves for each ply and the history score of each move, indexed
+        by the move encoded by encode_move."""
+        self._killers = []
+        self._history = [0] * (1 << 16)
+
+    def new_search(self):
+        """Forgets the killer moves and the history of the last search."""
+        self._killers = []
+        self._history = [0] * (1 << 16)
+
+    def order_moves(self, game, moves, ply, principal_move=None):
+        """Takes a XiangqiGame, its list of legal moves, the number of moves from the root and an optional move to
+        search before all others, and returns a new list of the moves in the order to search them."""
+        squares = game.get_game_board().get_squares()
+        killers = self._killers[ply] if ply < len(self._killers) else ()
+        history = self._history
+        scored_moves = []
+        for move in moves:
+            captured = squares[move & 255]
+            if captured != EMPTY:
+                score = CAPTURE_ORDER_SCORE + CAPTURE_ORDER_VALUES[captured & TYPE_MASK] * 8 - \
+                    CAPTURE_ORDER_VALUES[squares[move >> 8] & TYPE_MASK]
+            elif move in killers:
+                score = KILLER_ORDER_SCORE + KILLER_SLOTS - killers.index(move)
+            else:
+                score = history[move]
+            scored_moves.append((score, move))
+        scored_moves.sort(reverse=True)
+
+        ordered_moves = [move for score, move in scored_moves]
+        if principal_move is not None and principal_move in moves:
+            ordered_moves.remove(principal_move)
+            ordered_moves.insert(0, principal_move)
+        return ordered_moves
+
+    def record_cutoff(self, move, ply, depth, is_capture):
+        """Takes a move that caused a beta cutoff, the number of moves from the root, the depth left to search and
+        whether the move is a capture. Quiet moves are saved as killer moves for the ply and added to the history
+        table. Captures are already searched first, so they are not saved."""
+        if is_capture:
+            return
+        while len(self._killers) <= ply:
+            self._killers.append([])
+        killers = self._killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
+
+        history = self._history
+        history[move] += depth * depth
+        # halve every score when one gets too large, so the order is kept and old cutoffs count for less.
+        if history[move] > HISTORY_SCORE_LIMIT:
+            self._history = [score >> 1 for score in history]
+
+
+class Engine:
+    """Represents an engine that chooses moves with iterative deepening alpha-beta search."""
+
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH, move_orderer=None, check_evasions=True, tablebase=None):
+        """Takes an optional maximum search depth, an optional MoveOrderer, or an object with the same methods, to order
+        the moves, whether the quiescence search looks at every move out of check instead of only captures, and an
+        optional Tablebase to probe for exact results of endgame positions. Initializes private data members: the
+        maximum depth, the move orderer, check_evasions, the tablebase, and the state of the search in progress: the
+        nodes searched, the time and node limits, whether the search was stopped, the principal variation found at
+        each ply and the principal variation of the last finished iteration."""
+        self._max_depth = max_depth
+        if move_orderer is None:
+            move_orderer = MoveOrderer()
+        self._move_orderer = move_orderer
+        self._check_evasions = check_evasions
+        self._tablebase = tablebase
+        self._nodes = 0
+        self._deadline = None
+        self._node_limit = None
+        self._stopped = False
+        self._principal_variations = []
+        self._previous_principal_variation = []
+
+    def search(self, game, time_limit=None, node_limit=None, max_depth=None):
+        """Takes a XiangqiGame, an optional time limit in seconds, an optional limit on the number of nodes and an
+        optional maximum depth, and returns a SearchResult for the player whose turn it is. Searches one depth deeper
+        each iteration until a limit is reached. The first iteration is always finished so there is a move to
+        return. The game is back in the same position afterwards."""
+        start = time.perf_counter()
+        if max_depth is None:
+            max_depth = self._max_depth
+        self._nodes = 0
+        self._deadline = None if time_limit is None else start + time_limit
+        self._node_limit = node_limit
+        self._stopped = False
+        self._previous_principal_variation = []
+        self._move_orderer.new_search()
+
+        principal_variation = []
+        score = 0
+        depth = 0
+        if game.get_game_state() != "UNFINISHED":
+            return SearchResult(principal_variation, score, depth, self._nodes, time.perf_counter() - start)
+
+        for iteration_depth in range(1, max_depth + 1):
+            self._principal_variations = [[] for _ply in range(0, MAX_PLY + 1)]
+            iteration_score = self.search_node(game, iteration_depth, -INFINITE_SCORE, INFINITE_SCORE, 0,
+                                               iteration_depth > 1)
+            # a stopped iteration did not look at every move, so its result is not used.
+            if self._stopped:
+                break
+            principal_variation = self._principal_variations[0]
+            score = iteration_score
+            depth = iteration_depth
+            self._previous_principal_variation = principal_variation
+            # there is no need to search deeper once a forced win or loss is found.
+            if abs(score) > MATE_THRESHOLD:
+                break
+            if self.is_out_of_budget():
+                break
+
+        return SearchResult(principal_variation, score, depth, self._nodes, time.perf_counter() - start)
+
+    def search_node(self, game, depth, alpha, beta, ply, can_stop=True):
+        """Takes a XiangqiGame, the depth left to search, the alpha and beta bounds, the number of moves from the root,
+        and whether the search may stop when a limit is reached. Returns the score of the position for the player whose
+        turn it is and saves the principal variation from this ply."""
+        self._nodes += 1
+        self._principal_variations[ply] = []
+        if can_stop:
+            if self._node_limit is not None and self._nodes >= self._node_limit:
+                self._stopped = True
+            # reading the clock is slow, so the time limit is only checked every so many nodes.
+            elif self._nodes % NODES_BETWEEN_TIME_CHECKS == 0 and self._deadline is not None:
+                self._stopped = time.perf_counter() >= self._deadline
+        if self._stopped:
+            return 0
+
+        # the tablebase knows the result of an endgame position exactly. The root is searched so there is a move.
+        if self._tablebase is not None and ply > 0:
+            entry = self._tablebase.probe(game)
+            if entry is not None:
+                return self.tablebase_score(entry, ply)
+
+        if depth <= 0:
+            return self.quiescence(game, alpha, beta, ply, can_stop)
+
+        moves = game.legal_moves()
+        # a player with no legal moves has lost, whether they are in check or not.
+        if not moves:
+            return -MATE_SCORE + ply
+
+        squares = game.get_game_board().get_squares()
+        best_score = -INFINITE_SCORE
+        for move in self.order_moves(game, moves, ply):
+            is_capture = squares[move & 255] != EMPTY
+            game.push(move)
+            score = -self.search_node(game, depth - 1, -beta, -alpha, ply + 1, can_stop)
+            game.pop()
+            if self._stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    self._principal_variations[ply] = [move] + self._principal_variations[ply + 1]
+                    if score >= beta:
+                        self._move_orderer.record_cutoff(move, ply, depth, is_capture)
+                        break
+        return best_score
+
+    def quiescence(self, game, alpha, beta, ply, can_stop=True):
+        """Takes a XiangqiGame, the alpha and beta bounds, the number of moves from the root, and whether the search may
+        stop when a limit is reached. Searches captures until the position is quiet and returns the score for the
+        player whose turn it is. The player may stand pat with the evaluation instead of capturing, unless they are in
+        check and check evasions are searched, in which case every move out of check is searched."""
+        self._nodes += 1
+        self._principal_variations[ply] = []
+        if can_stop:
+            if self._node_limit is not None and self._nodes >= self._node_limit:
+                self._stopped = True
+            elif self._nodes % NODES_BETWEEN_TIME_CHECKS == 0 and self._deadline is not None:
+                self._stopped = time.perf_counter() >= self._deadline
+        if self._stopped:
+            return 0
+        if ply >= MAX_PLY:
+            return self.evaluate(game)
+
+        in_check = self._check_evasions and game.is_in_check(game.get_players_turn())
+        if in_check:
+            moves = game.legal_moves()
+            if not moves:
+                return -MATE_SCORE + ply
+            stand_pat = -INFINITE_SCORE
+            best_score = -INFINITE_SCORE
+        else:
+            stand_pat = self.evaluate(game)
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            best_score = stand_pat
+            moves = game.legal_captures()
+
+        squares = game.get_game_board().get_squares()
+        for move in self._move_orderer.order_moves(game, moves, ply):
+            captured = squares[move & 255]
+            # delta pruning: skip captures that can't raise the score to alpha even with a margin to spare.
+            if not in_check and stand_pat + PIECE_VALUES[captured & TYPE_MASK] + DELTA_MARGIN <= alpha:
+                continue
+            game.push(move)
+            score = -self.quiescence(game, -beta, -alpha, ply + 1, can_stop)
+            game.pop()
+            if self._stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    self._principal_variations[ply] = [move] + self._principal_variations[ply + 1]
+                    if score >= beta:
+                        break
+        return best_score
+
+    def tablebase_score(self, entry, ply):
+        """Takes a tablebase entry and the number of moves from the root, and returns the score of the position for
+        the player whose turn it is, on the same scale as a checkmate found by the search."""
+        if entry > 0:
+            return MATE_SCORE - ply - entry
+        if entry < 0:
+            return -MATE_SCORE + ply - entry - 1
+        return 0
+
+    def order_moves(self, game, moves, ply):
+        """Takes a XiangqiGame, its list of legal moves and the number of moves from the root, and returns the moves in
+        the order to search them. The move of the last iteration's principal variation at this ply is searched first
+        and the move orderer orders the rest."""
+        previous_principal_variation = self._previous_principal_variation
+        principal_move = None
+        if ply < len(previous_principal_variation):
+            principal_move = previous_principal_variation[ply]
+        return self._move_orderer.order_moves(game, moves, ply, principal_move)
+
+    def evaluate(self, game):
+        """Takes a XiangqiGame and returns the board's evaluation: the value of the red pieces and the points they stand
+        on less the same for the black pieces, from the point of view of the player whose turn it is. The board keeps
+        the evaluation up to date as moves are made, so this does not look at the pieces."""
+        if game.get_players_turn() == "black":
+            return -game.get_game_board().get_evaluation()
+        return game.get_game_board().get_evaluation()
+
+    def is_out_of_budget(self):
+        """Returns True if the time limit or the node limit of the search has been reached, otherwise returns False."""
+        if self._node_limit is not None and self._nodes >= self._node_limit:
+            return True
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return True
+        return False
+
+
+def find_best_move(game, time_limit=1.0, node_limit=None, max_depth=DEFAULT_MAX_DEPTH, book=None):
+    """Takes a XiangqiGame, an optional time limit in seconds, an optional node limit, an optional maximum depth and an
+    optional OpeningBook, and returns the best move for the player whose turn it is as a (move from, move to) pair in
+    algebraic notation that can be passed to make_move. A move from the book is used without searching when the
+    position is in it. Returns None if there is no legal move."""
+    if book is not None:
+        book_move = book.choose_move(game)
+        if book_move is not None:
+            return square_name(book_move >> 8).upper(), square_name(book_move & 255).upper()
+    result = Engine(max_depth).search(game, time_limit, node_limit)
+    notation = result.get_principal_variation_notation()
+    if not notation:
+        return None
+    return notation[0]
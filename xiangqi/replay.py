@@ -0,0 +1,94 @@
+# Date: 10/18/2026
+# Description: Replays recorded games to check them. One XiangqiGame is reused for every game: the moves are made with
+#              push and taken back with pop, each move is checked with is_legal_move, and whether the game is over is
+#              only worked out once, at the end of each game.
+
+from xiangqi import REPETITION_LIMIT, XiangqiGame
+
+
+class ReplayResult:
+    """Represents the result of replaying one game."""
+
+    def __init__(self, moves_played, illegal_ply, illegal_move, game_state, position):
+        """Takes the number of moves played, the index of the first illegal move in the game's moves and that move, or
+        None for both if every move was legal, the game state after the moves played, and the position after them made
+        by XiangqiGame.to_bytes. Initializes private data members for each of them."""
+        self._moves_played = moves_played
+        self._illegal_ply = illegal_ply
+        self._illegal_move = illegal_move
+        self._game_state = game_state
+        self._position = position
+
+    def __repr__(self):
+        """Returns unambiguous representation of all the data in the object."""
+        return "ReplayResult(" + str(self._moves_played) + ", " + str(self._illegal_ply) + ", " + \
+               str(self._illegal_move) + ", " + str(self._game_state) + ", " + repr(self._position) + ")"
+
+    def get_moves_played(self):
+        """Returns the number of moves that were played before the end of the game or the first illegal move."""
+        return self._moves_played
+
+    def get_illegal_ply(self):
+        """Returns the index in the game's moves of the first illegal move, or None if every move was legal."""
+        return self._illegal_ply
+
+    def get_illegal_move(self):
+        """Returns the first illegal move encoded by encode_move, or None if every move was legal."""
+        return self._illegal_move
+
+    def is_valid(self):
+        """Returns True if every move in the game was legal, otherwise returns False."""
+        return self._illegal_ply is None
+
+    def get_game_state(self):
+        """Returns the game state after the moves played: "UNFINISHED", "RED_WON", "BLACK_WON" or "DRAW"."""
+        return self._game_state
+
+    def get_position(self):
+        """Returns the position after the moves played, made by XiangqiGame.to_bytes."""
+        return self._position
+
+
+def replay_game(game, moves, validate=True, on_move=None):
+    """Takes a XiangqiGame at the starting position and a sequence of moves encoded by encode_move, and returns a
+    ReplayResult for them. When validate is True each move is checked and the game stops at its first illegal move,
+    and a move after a position comes up REPETITION_LIMIT times is illegal because the game is over. When validate is
+    False the moves are trusted and made without being checked. An optional function is called after each move is
+    made with the game, the move and the code of the piece it captured, or EMPTY. The moves are taken back before
+    returning so the game can be used again."""
+    squares = game.get_game_board().get_squares()
+    moves_played = 0
+    illegal_ply = None
+    illegal_move = None
+    game_over = False
+    for move in moves:
+        if validate is True and (game_over or game.is_legal_move(move) is False):
+            illegal_ply = moves_played
+            illegal_move = move
+            break
+        # the captured piece is only looked up when there is someone to tell.
+        if on_move is not None:
+            captured = squares[move & 255]
+            game.push(move)
+            on_move(game, move, captured)
+        else:
+            game.push(move)
+        moves_played += 1
+        # a repeated position ends the game, and update_game_state below finds out how.
+        game_over = game.get_repetition_count() >= REPETITION_LIMIT
+
+    # the game state is only needed for the last position.
+    game.update_game_state()
+    result = ReplayResult(moves_played, illegal_ply, illegal_move, game.get_game_state(), game.to_bytes())
+
+    # take the moves back so the next game starts from the starting position.
+    game.pop_all()
+    return result
+
+
+def replay(games, validate=True, position_cache=None):
+    """Takes an iterable of games, each a sequence of moves encoded by encode_move from the starting position, such as
+    the games of an ArchiveReader. Returns a list with a ReplayResult for each game, made by replay_game. An optional
+    PositionCache is used by the game the moves are replayed on."""
+    game = XiangqiGame(position_cache=position_cache)
+    return [replay_game(game, moves, validate) for moves in games]
@@ -0,0 +1,503 @@
+# Date: 10/18/2026
+# Description: Endgame tablebases made by retrograde analysis. A tablebase covers every position of a small set of
+#              pieces, such as a red chariot against two black advisors ("KRkaa"), with each player to move, and
+#              holds the distance to mate of each position. Generals, advisors, elephants and soldiers are only
+#              indexed on the points their moves can reach, so the palace and river rules keep the files small. The
+#              moves of each position are found on several processes, then the results are worked back from the
+#              checkmates one ply at a time. The files are memory-mapped so a probe is a single read.
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from xiangqi import EMPTY, GENERAL, ADVISOR, ELEPHANT, SOLDIER, RED, BLACK, TYPE_MASK, COLOR_MASK, COLOR_NAMES, \
+    BOARD_SQUARES, FEN_PIECE_LETTERS, FEN_PIECE_TYPES, GENERAL_MOVES, ADVISOR_MOVES, ELEPHANT_MOVES, SOLDIER_MOVES, \
+    Board, XiangqiGame
+
+# the header is the magic bytes, the format version, unused flags, the signature padded to 16 bytes and the number of
+# entries. The entries follow as little-endian signed 16-bit integers.
+TABLEBASE_MAGIC = b"XQTB"
+TABLEBASE_VERSION = 1
+HEADER_FORMAT = struct.Struct("<4sHH16sQ")
+ENTRY_FORMAT = struct.Struct("<h")
+TABLEBASE_EXTENSION = ".xqtb"
+# the number of positions each worker process is given at a time.
+POSITIONS_PER_SHARD = 4096
+
+# the order pieces are listed in a signature: the general first, then the defenders and then the attackers.
+SIGNATURE_ORDER = "KABNRCP"
+
+
+def _reachable_squares(code):
+    """Takes a piece code and returns the sorted tuple of squares that piece can ever stand on, found by following its
+    move table from its starting squares. Pieces that can go anywhere on the board are given every square."""
+    piece_type = code & TYPE_MASK
+    color = code & COLOR_MASK
+    move_tables = {GENERAL: GENERAL_MOVES, ADVISOR: ADVISOR_MOVES, ELEPHANT: ELEPHANT_MOVES, SOLDIER: SOLDIER_MOVES}
+    if piece_type not in move_tables:
+        return BOARD_SQUARES
+    move_table = move_tables[piece_type][color]
+    starting_board = Board()
+    squares_to_visit = [square for square in starting_board.get_piece_squares(color)
+                        if starting_board.get_squares()[square] == code]
+    reachable = set(squares_to_visit)
+    while squares_to_visit:
+        square = squares_to_visit.pop()
+        for destination in move_table[square]:
+            # the elephant table holds (destination, eye) pairs.
+            if isinstance(destination, tuple):
+                destination = destination[0]
+            if destination not in reachable:
+                reachable.add(destination)
+                squares_to_visit.append(destination)
+    return tuple(sorted(reachable))
+
+
+def signature_codes(signature):
+    """Takes a signature such as "KRkaa", with upper case letters for red pieces and lower case letters for black, and
+    returns the piece codes in the order they are indexed: red then black, each in SIGNATURE_ORDER. Returns None if
+    the signature does not have exactly one general of each color or has a letter that is not a piece."""
+    codes = []
+    for letter in signature:
+        piece_type = FEN_PIECE_TYPES.get(letter.lower())
+        if piece_type is None:
+            return None
+        codes.append((RED if letter.isupper() else BLACK) | piece_type)
+    if codes.count(RED | GENERAL) != 1 or codes.count(BLACK | GENERAL) != 1:
+        return None
+    return sorted(codes, key=lambda code: (code & COLOR_MASK, SIGNATURE_ORDER.index(
+        FEN_PIECE_LETTERS[code & TYPE_MASK].upper())))
+
+
+def codes_signature(codes):
+    """Takes a list of piece codes and returns its signature in the canonical order, such as "KRkaa"."""
+    ordered = sorted(codes, key=lambda code: (code & COLOR_MASK, SIGNATURE_ORDER.index(
+        FEN_PIECE_LETTERS[code & TYPE_MASK].upper())))
+    return "".join(FEN_PIECE_LETTERS[code & TYPE_MASK].upper() if code & RED else FEN_PIECE_LETTERS[code & TYPE_MASK]
+                   for code in ordered)
+
+
+def board_signature(board):
+    """Takes a Board and returns the signature of the pieces on it."""
+    squares = board.get_squares()
+    occupied_squares = board.get_piece_squares(RED) | board.get_piece_squares(BLACK)
+    return codes_signature([squares[square] for square in occupied_squares])
+
+
+class TablebaseLayout:
+    """Represents how the positions of a signature are numbered. Each piece has a digit: the place of its square in the
+    list of squares it can reach. A position's index is its digits read as a mixed-radix number, plus the number of
+    positions with one side to move when black is to move."""
+
+    def __init__(self, signature):
+        """Takes a signature such as "KRkaa". Initializes private data members: the canonical signature, the piece
+        codes, the squares each piece can reach, maps from square to digit for each piece, the weight of each digit,
+        and the number of positions for each side to move."""
+        self._codes = signature_codes(signature)
+        self._signature = codes_signature(self._codes)
+        self._piece_squares = [_reachable_squares(code) for code in self._codes]
+        self._square_digits = [{square: digit for digit, square in enumerate(squares)}
+                               for squares in self._piece_squares]
+        self._weights = []
+        weight = 1
+        for squares in reversed(self._piece_squares):
+            self._weights.insert(0, weight)
+            weight *= len(squares)
+        self._side_size = weight
+
+    def get_signature(self):
+        """Returns the canonical signature."""
+        return self._signature
+
+    def get_codes(self):
+        """Returns the list of piece codes in the order they are indexed."""
+        return self._codes
+
+    def get_size(self):
+        """Returns the number of entries: the positions with red to move followed by those with black to move."""
+        return 2 * self._side_size
+
+    def get_side_size(self):
+        """Returns the number of positions with one side to move."""
+        return self._side_size
+
+    def get_weights(self):
+        """Returns the weight of each piece's digit in an index."""
+        return self._weights
+
+    def get_square_digits(self):
+        """Returns a list with a dictionary for each piece that maps the squares it can reach to its digit."""
+        return self._square_digits
+
+    def decode(self, index):
+        """Takes an index and returns a tuple of the color code to move and the list of the pieces' squares."""
+        color = BLACK if index >= self._side_size else RED
+        index %= self._side_size
+        squares = []
+        for piece_squares, weight in zip(self._piece_squares, self._weights):
+            squares.append(piece_squares[index // weight])
+            index %= weight
+        return color, squares
+
+    def encode_board(self, board, color):
+        """Takes a Board holding exactly the pieces of the signature and the color code to move, and returns the index
+        of the position. Returns None if a piece is on a square it could not reach."""
+        squares = board.get_squares()
+        # the squares holding each piece code, given to the pieces of that code in order.
+        code_squares = {}
+        for square in sorted(board.get_piece_squares(RED) | board.get_piece_squares(BLACK)):
+            code_squares.setdefault(squares[square], []).append(square)
+        index = self._side_size if color == BLACK else 0
+        used = {}
+        for code, square_digits, weight in zip(self._codes, self._square_digits, self._weights):
+            count = used.get(code, 0)
+            used[code] = count + 1
+            digit = square_digits.get(code_squares[code][count])
+            if digit is None:
+                return None
+            index += digit * weight
+        return index
+
+
+# the layouts already made in this process, by signature.
+_layouts = {}
+
+
+def get_layout(signature):
+    """Takes a signature and returns its TablebaseLayout, making it the first time it is asked for in a process."""
+    layout = _layouts.get(signature)
+    if layout is None:
+        layout = TablebaseLayout(signature)
+        _layouts[signature] = layout
+    return layout
+
+
+def sub_signatures(signature):
+    """Takes a signature and returns the sorted list of signatures left after one piece other than a general is
+    captured."""
+    codes = signature_codes(signature)
+    signatures = set()
+    for position, code in enumerate(codes):
+        if code & TYPE_MASK != GENERAL:
+            signatures.add(codes_signature(codes[:position] + codes[position + 1:]))
+    return sorted(signatures)
+
+
+def _generate_shard(signature, first_index, last_index):
+    """Takes a signature and a range of indexes, from the first up to but not including the last, and finds the legal
+    moves of each of those positions. Returns a tuple of: a bytearray with 1 for each index that is a legal position,
+    a bytearray with 1 for each legal position with no legal moves, arrays of the parent and child index of every
+    move that does not capture, and arrays of the parent index, sub-signature number and child index of every
+    capture. Runs in a worker process."""
+    layout = get_layout(signature)
+    codes = layout.get_codes()
+    weights = layout.get_weights()
+    square_digits = layout.get_square_digits()
+    side_size = layout.get_side_size()
+    captured_signatures = sub_signatures(signature)
+
+    valid = bytearray(last_index - first_index)
+    no_moves = bytearray(last_index - first_index)
+    parents = array("I")
+    children = array("I")
+    capture_parents = array("I")
+    capture_signatures = array("B")
+    capture_children = array("I")
+
+    board = Board(starting_position=False)
+    game = XiangqiGame(board=board)
+    for index in range(first_index, last_index):
+        color, piece_squares = layout.decode(index)
+        if len(set(piece_squares)) != len(piece_squares):
+            continue
+        board.set_pieces(list(zip(piece_squares, codes)))
+        # a position where the player who just moved left their general exposed can't happen.
+        if game.is_general_exposed(color ^ COLOR_MASK):
+            continue
+        game.set_players_turn(COLOR_NAMES[color])
+        valid[index - first_index] = 1
+        moves = game.legal_moves()
+        if not moves:
+            no_moves[index - first_index] = 1
+            continue
+
+        # the child of a quiet move differs from the parent in the moved piece's digit and the side to move.
+        side_offset = -side_size if color == BLACK else side_size
+        for move in moves:
+            from_square = move >> 8
+            to_square = move & 255
+            if board.get_squares()[to_square] != EMPTY:
+                game.push(move)
+                sub_signature = board_signature(board)
+                child = get_layout(sub_signature).encode_board(board, color ^ COLOR_MASK)
+                game.pop()
+                capture_parents.append(index)
+                capture_signatures.append(captured_signatures.index(sub_signature))
+                capture_children.append(child)
+                continue
+            piece = piece_squares.index(from_square)
+            child = index + side_offset + (square_digits[piece][to_square] - square_digits[piece][from_square]) * \
+                weights[piece]
+            parents.append(index)
+            children.append(child)
+    return valid, no_moves, parents, children, capture_parents, capture_signatures, capture_children
+
+
+def tablebase_path(directory, signature):
+    """Takes a directory and a signature and returns the path of that signature's tablebase file."""
+    return os.path.join(directory, codes_signature(signature_codes(signature)) + TABLEBASE_EXTENSION)
+
+
+def _check_header(data, signature, path):
+    """Takes the contents of a tablebase file, or a memory map of it, the canonical signature it should hold and its
+    path. Raises ValueError if the file is not a tablebase of a known version, is for a different signature, or does
+    not have one entry for every position of the signature."""
+    if len(data) < HEADER_FORMAT.size:
+        raise ValueError("not a tablebase: " + path)
+    magic, version, flags, file_signature, size = HEADER_FORMAT.unpack_from(data, 0)
+    if magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION:
+        raise ValueError("not a tablebase of version " + str(TABLEBASE_VERSION) + ": " + path)
+    if file_signature.rstrip(b"\0") != signature.encode("ascii"):
+        raise ValueError("not a tablebase of " + signature + ": " + path)
+    expected_size = get_layout(signature).get_size()
+    if size != expected_size or len(data) != HEADER_FORMAT.size + expected_size * ENTRY_FORMAT.size:
+        raise ValueError("tablebase does not have " + str(expected_size) + " entries: " + path)
+
+
+def _read_entries(path, signature):
+    """Takes the path of a tablebase file and the canonical signature it should hold, and returns its entries as an
+    array of integers. Raises ValueError if the file does not pass _check_header."""
+    with open(path, "rb") as tablebase_file:
+        data = tablebase_file.read()
+    _check_header(data, signature, path)
+    entries = array("h")
+    entries.frombytes(data[HEADER_FORMAT.size:])
+    if sys.byteorder != "little":
+        entries.byteswap()
+    return entries
+
+
+def generate_tablebase(signature, directory, workers=None):
+    """Takes a signature such as "KRkaa", the directory to write to and an optional number of worker processes, and
+    writes the tablebase of that signature to the directory, first writing any tablebase it needs for positions after a
+    capture that is not already there. Returns the path of the file, or False if the signature is not valid.
+
+    Each entry is the distance to mate of a position with correct play: a positive number is a win for the player to
+    move in that many plies, a negative number -n is a loss in n - 1 plies, and 0 is a draw or a position that can't
+    happen. Repetitions are not considered."""
+    codes = signature_codes(signature)
+    if codes is None:
+        return False
+    signature = codes_signature(codes)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    captured_signatures = sub_signatures(signature)
+    for sub_signature in captured_signatures:
+        if not os.path.exists(tablebase_path(directory, sub_signature)):
+            generate_tablebase(sub_signature, directory, workers)
+    sub_entries = [_read_entries(tablebase_path(directory, sub_signature), sub_signature)
+                   for sub_signature in captured_signatures]
+
+    layout = get_layout(signature)
+    size = layout.get_size()
+    shards = [(first_index, min(first_index + POSITIONS_PER_SHARD, size))
+              for first_index in range(0, size, POSITIONS_PER_SHARD)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    signatures = [signature] * len(shards)
+    firsts = [shard[0] for shard in shards]
+    lasts = [shard[1] for shard in shards]
+    if workers == 1:
+        shard_results = list(map(_generate_shard, signatures, firsts, lasts))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shard_results = list(executor.map(_generate_shard, signatures, firsts, lasts))
+
+    entries = _solve(size, shard_results, sub_entries)
+    if sys.byteorder != "little":
+        entries.byteswap()
+    path = tablebase_path(directory, signature)
+    with open(path, "wb") as tablebase_file:
+        tablebase_file.write(HEADER_FORMAT.pack(TABLEBASE_MAGIC, TABLEBASE_VERSION, 0, signature.encode("ascii"), size))
+        tablebase_file.write(entries.tobytes())
+    return path
+
+
+def _solve(size, shard_results, sub_entries):
+    """Takes the number of positions, the results of _generate_shard for every shard in order and the entries of the
+    tablebases reached by captures, and works out the distance to mate of every position. Starts from the positions
+    with no legal moves, which are lost, and goes back one ply at a time: a position with a move to a lost position is
+    won, and a position whose every move goes to a won position is lost. Returns the array of entries."""
+    valid = bytearray()
+    no_moves = bytearray()
+    parents = array("I")
+    children = array("I")
+    capture_parents = array("I")
+    capture_values = array("h")
+    for shard_valid, shard_no_moves, shard_parents, shard_children, shard_capture_parents, shard_capture_signatures, \
+            shard_capture_children in shard_results:
+        valid += shard_valid
+        no_moves += shard_no_moves
+        parents += shard_parents
+        children += shard_children
+        capture_parents += shard_capture_parents
+        for sub_signature, child in zip(shard_capture_signatures, shard_capture_children):
+            capture_values.append(sub_entries[sub_signature][child])
+
+    # the number of moves of each position whose result is not known yet.
+    remaining = array("i", [0]) * size
+    for parent in parents:
+        remaining[parent] += 1
+    for parent in capture_parents:
+        remaining[parent] += 1
+
+    # the parents of each position, stored together with the offset where each position's parents start.
+    offsets = array("I", [0]) * (size + 1)
+    for child in children:
+        offsets[child + 1] += 1
+    for index in range(0, size):
+        offsets[index + 1] += offsets[index]
+    predecessors = array("I", [0]) * len(children)
+    filled = array("I", offsets[:size])
+    for parent, child in zip(parents, children):
+        predecessors[filled[child]] = parent
+        filled[child] += 1
+
+    # the positions found at each ply, and the results of captures, which are known from the smaller tablebases.
+    entries = array("h", [0]) * size
+    found = {}
+    capture_events = {}
+    for index in range(0, size):
+        if no_moves[index]:
+            entries[index] = -1
+            found.setdefault(0, []).append(index)
+    for parent, value in zip(capture_parents, capture_values):
+        # a draw after a capture never changes the result, so it is left out.
+        if value > 0:
+            capture_events.setdefault(value, []).append((parent, value))
+        elif value < 0:
+            capture_events.setdefault(-value - 1, []).append((parent, value))
+
+    plies = 0
+    while found or capture_events:
+        # the positions whose result was found at this ply, then the captures whose result is this many plies.
+        results = [(parent, entries[index]) for index in found.pop(plies, [])
+                   for parent in predecessors[offsets[index]:offsets[index + 1]]]
+        results += capture_events.pop(plies, [])
+        for parent, child_value in results:
+            if entries[parent] != 0 or not valid[parent]:
+                continue
+            if child_value < 0:
+                # a move to a lost position wins.
+                entries[parent] = plies + 1
+                found.setdefault(plies + 1, []).append(parent)
+            else:
+                # the position is lost once every move goes to a won position.
+                remaining[parent] -= 1
+                if remaining[parent] == 0:
+                    entries[parent] = -(plies + 2)
+                    found.setdefault(plies + 1, []).append(parent)
+        plies += 1
+    return entries
+
+
+class Tablebase:
+    """Represents the tablebase files in a directory, opened for probing. Each file is memory-mapped the first time a
+    position with its pieces is probed."""
+
+    def __init__(self, directory, max_pieces=None):
+        """Takes the directory of the tablebase files and optionally the most pieces, counting the generals, a position
+        can have to be probed. Initializes private data members: the directory, the open files by signature, and the
+        most pieces of any file in the directory if max_pieces is not given."""
+        self._directory = directory
+        self._tables = {}
+        if max_pieces is None:
+            max_pieces = 0
+            for file_name in os.listdir(directory):
+                if file_name.endswith(TABLEBASE_EXTENSION):
+                    max_pieces = max(max_pieces, len(file_name) - len(TABLEBASE_EXTENSION))
+        self._max_pieces = max_pieces
+
+    def __enter__(self):
+        """Returns the tablebase so it can be used in a with statement."""
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """Closes the tablebase at the end of a with statement."""
+        self.close()
+
+    def get_max_pieces(self):
+        """Returns the most pieces, counting the generals, a position can have to be probed."""
+        return self._max_pieces
+
+    def get_table(self, signature):
+        """Takes a canonical signature and returns a tuple of its layout and the memory map of its file, or None if
+        there is no file for it in the directory."""
+        if signature in self._tables:
+            return self._tables[signature]
+        path = tablebase_path(self._directory, signature)
+        table = None
+        if os.path.exists(path):
+            with open(path, "rb") as tablebase_file:
+                table_map = mmap.mmap(tablebase_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                _check_header(table_map, signature, path)
+            except ValueError:
+                table_map.close()
+                raise
+            table = (get_layout(signature), table_map)
+        self._tables[signature] = table
+        return table
+
+    def probe(self, game):
+        """Takes a XiangqiGame and returns the entry for its position: a positive number is a win for the player whose
+        turn it is in that many plies, a negative number -n is a loss in n - 1 plies and 0 is a draw. Returns None if
+        the position is not covered by a file in the directory, or does not have exactly one general of each color."""
+        board = game.get_game_board()
+        if len(board.get_piece_squares(RED)) + len(board.get_piece_squares(BLACK)) > self._max_pieces:
+            return None
+        signature = board_signature(board)
+        if signature_codes(signature) is None:
+            return None
+        table = self.get_table(signature)
+        if table is None:
+            return None
+        layout, table_map = table
+        index = layout.encode_board(board, BLACK if game.get_players_turn() == "black" else RED)
+        if index is None:
+            return None
+        return ENTRY_FORMAT.unpack_from(table_map, HEADER_FORMAT.size + index * ENTRY_FORMAT.size)[0]
+
+    def close(self):
+        """Closes the memory maps of every file that was opened."""
+        for table in self._tables.values():
+            if table is not None:
+                table[1].close()
+        self._tables = {}
+
+
+def main(argv=None):
+    """Takes the command line arguments and generates the tablebases they name. Returns the exit status: 0 if every
+    tablebase was written and 1 if a signature was not valid."""
+    parser = argparse.ArgumentParser(description="Generates endgame tablebases by retrograde analysis.")
+    parser.add_argument("signatures", nargs="+", help="the pieces of each tablebase, such as KRkaa")
+    parser.add_argument("--directory", default="tablebases", help="the directory to write the files to")
+    parser.add_argument("--workers", type=int, default=None, help="the number of worker processes")
+    arguments = parser.parse_args(argv)
+    exit_status = 0
+    for signature in arguments.signatures:
+        path = generate_tablebase(signature, arguments.directory, arguments.workers)
+        if path is False:
+            print("not a valid signature: " + signature)
+            exit_status = 1
+        else:
+            print("wrote " + path)
+    return exit_status
+
+
+if __name__ == "__main__":
+    sys.exit(main())